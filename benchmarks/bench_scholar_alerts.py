@@ -0,0 +1,69 @@
+"""Time FeedParser.get_papers on a generated kill-the-newsletter inbox of Google Scholar alert mails. Every seventh mail
+is malformed, i.e. one of its papers has no author line and one title has no target url. Run from the repository root,
+e.g. python benchmarks/bench_scholar_alerts.py -n 10000"""
+import argparse
+import os
+import random
+import sys
+import time
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from misc.settings import get_settings  # noqa: E402
+from parsers.feeds.parser import FeedParser  # noqa: E402
+
+paper_urls = ["https://arxiv.org/abs/2301.{:05d}", "https://ieeexplore.ieee.org/abstract/document/{}/",
+              "https://www.sciencedirect.com/science/article/pii/S{:016d}",
+              "https://link.springer.com/article/10.1007/s1{:04d}", "https://example.com/paper{}"]
+
+
+def get_alert_mail(idx: int, n_papers: int, malformed: bool) -> str:
+    """Get the html body of an alert mail in the format of Google Scholar."""
+    parts = []
+    for paper_idx in range(idx * n_papers, (idx + 1) * n_papers):
+        url = random.choice(paper_urls).format(paper_idx)
+        # a malformed mail links its last title without a target url
+        query = "hl=en" if malformed and paper_idx % n_papers == n_papers - 1 else f"url={url}&amp;hl=en"
+        parts.append(f'<h3 style="font-weight:normal;margin:0;font-size:17px;line-height:20px;">'
+                     f'<span style="font-size:11px;font-weight:bold;color:#1a0dab;vertical-align:2px">[PDF]</span> '
+                     f'<a href="https://scholar.google.com/scholar_url?{query}&amp;sa=X&amp;d={paper_idx}&amp;'
+                     f'scisig=xyz&amp;oi=scholaralrt" class="gse_alrt_title" style="font-size:17px;color:#1a0dab">'
+                     f'Deep <b>learning</b> for things {paper_idx} &amp; more</a></h3>')
+        # and lacks the author line of its second paper
+        if not (malformed and paper_idx % n_papers == 1):
+            parts.append(f'<div style="color:#006621;line-height:18px">A Smith{paper_idx}, B Jones, C Lee - '
+                         f'arXiv preprint arXiv:2301.{paper_idx}, 2023</div>')
+        parts.append('<div class="gse_alrt_sni" style="line-height:17px">Some snippet with <b>bold</b> words</div><br>')
+    parts.append('<a href="https://scholar.google.com/scholar_alerts?view_op=list_alerts&amp;hl=en">See all</a>')
+    return f"<div>{''.join(parts)}</div>"
+
+
+def get_inbox(n_mails: int, n_papers: int) -> bytes:
+    """Get an atom feed of alert mails as provided by kill-the-newsletter."""
+    entries = [f'<entry><id>urn:uuid:{idx}</id><title>Scholar Alert {idx}</title>'
+               f'<updated>2023-01-{idx % 28 + 1:02d}T00:00:00Z</updated>'
+               f'<content type="html">{escape(get_alert_mail(idx, n_papers, idx % 7 == 3))}</content></entry>'
+               for idx in range(n_mails)]
+    return ('<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>inbox</title>'
+            f'{"".join(entries)}</feed>').encode()
+
+
+def main(args: argparse.Namespace) -> None:
+    random.seed(0)
+    content = get_inbox(args.n_mails, args.n_papers)
+    n_malformed = len(range(3, args.n_mails, 7))
+    expected = args.n_mails * args.n_papers - n_malformed
+    print(f"Generated {args.n_mails} mails ({len(content) / 2 ** 20:.1f} MiB), {n_malformed} of them malformed.")
+    feed_parser = FeedParser("inbox", "bench_scholar_alerts.xml", False, False, get_settings(), content=content)
+    start = time.perf_counter()
+    papers = feed_parser.get_papers()
+    duration = time.perf_counter() - start
+    n_authors = sum(bool(paper.authors) for paper in papers)
+    print(f"get_papers {duration:6.2f} s, {len(papers)} of {expected} papers with a url, {n_authors} with authors")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--n_mails", "-n", type=int, default=10000, help="Number of alert mails of the inbox.")
+    arg_parser.add_argument("--n_papers", "-p", type=int, default=4, help="Number of papers per alert mail.")
+    main(arg_parser.parse_args())
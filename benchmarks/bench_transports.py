@@ -0,0 +1,36 @@
+"""Compare the aiohttp and http2 transports against the stand-in of benchmarks/http2_stand_in.py, which has to be served
+on 127.0.0.1:8443. Run from the repository root, e.g. python benchmarks/bench_transports.py -n 1000 -d 0.1"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from misc import config, utils  # noqa: E402
+
+host = "127.0.0.1:8443"
+
+
+def main(args: argparse.Namespace) -> None:
+    config.verify_ssl = False  # self-signed certificate of the stand-in
+    config.archive_pages = False
+    links = [f"https://{host}/{idx}?d={args.delay}" for idx in range(args.n_requests)]
+    for name in ["aiohttp", "http2"]:
+        config.domain_transports = {host: name}
+        for head_only in [False, True]:
+            start = time.perf_counter()
+            results = asyncio.run(utils.fetch_urls(links, head_only=len(links) * [head_only]))
+            duration = time.perf_counter() - start
+            stats = httpx.get(f"https://{host}/stats", verify=False).text
+            print(f"{name:8s} head_only={head_only!s:5s} {duration:6.2f} s, {sum(result.ok for result in results)} ok, "
+                  f"{stats.split()[0]} connections")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--n_requests", "-n", type=int, default=1000, help="Number of requested pages.")
+    arg_parser.add_argument("--delay", "-d", type=float, default=0.02,
+                            help="Response delay of the stand-in in seconds.")
+    main(arg_parser.parse_args())
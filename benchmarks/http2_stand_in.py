@@ -0,0 +1,43 @@
+"""Local HTTP/2 stand-in of a publisher for benchmarks/bench_transports.py. Each request is answered with a paper page
+of 20 kB after the delay (seconds) of the query parameter d, which emulates the latency of a remote server. /stats
+returns the number of client connections since the last call, /e503 a 503 response.
+
+Serve it with TLS (HTTP/2 is negotiated via ALPN), e.g.:
+    openssl req -x509 -newkey rsa:2048 -nodes -keyout key.pem -out cert.pem -days 30 -subj /CN=127.0.0.1
+    hypercorn --certfile cert.pem --keyfile key.pem --bind 127.0.0.1:8443 benchmarks.http2_stand_in:app
+"""
+import asyncio
+
+connections = set()
+
+
+async def app(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            else:
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    path = scope["path"]
+    if path == "/stats":
+        body = f"{len(connections)} {scope['http_version']}".encode()
+        connections.clear()
+    elif path.startswith("/e503"):
+        await send({"type": "http.response.start", "status": 503, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    else:
+        connections.add(tuple(scope["client"]))
+        params = dict(param.split("=") for param in scope["query_string"].decode().split("&") if param)
+        await asyncio.sleep(float(params.get("d", 0.02)))
+        paper_id = path.strip("/")
+        body = (f'<html><head><meta name="citation_pdf_url" content="{paper_id}.pdf"><title>Paper {paper_id}</title>'
+                f'</head><body>{20000 * "x"}</body></html>').encode()
+
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/html; charset=utf-8"),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
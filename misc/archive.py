@@ -0,0 +1,102 @@
+from __future__ import annotations
+import glob
+import os
+import socket
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from misc import config
+
+
+class PageArchive:
+    """Append-only archive of the raw pages of all successful requests, which allows to extract the paper information
+    again without network access (see reextract.py), e.g. after a selector of a parser was fixed.
+
+    The pages are compressed individually and appended to segment files. Each process writes its own segment, so
+    workers of sharded crawls do not interfere. A SQLite index maps the urls and fetch times to the position of the
+    pages in the segments. A page is solely indexed after it was written, thus the index never refers to missing data.
+    If the segments exceed the maximal size, the oldest ones are deleted.
+    """
+    def __init__(self, folder: str = None) -> None:
+        self.folder = folder or config.archive_folder
+        self.index_file = f"{self.folder}/index.sqlite"
+        self.segment = None
+        self.segment_pid = None
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(self.folder, exist_ok=True)
+        connection = sqlite3.connect(self.index_file, timeout=60)
+        connection.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT, fetched_at REAL, segment TEXT, "
+                           "offset INTEGER, length INTEGER, status INTEGER, encoding TEXT)")
+        connection.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched_at)")
+        return connection
+
+    def get_segment(self) -> str:
+        """Get the segment of the current process, a new segment is started if the current one is full."""
+        segment_path = f"{self.folder}/{self.segment}"
+        if (self.segment is None or self.segment_pid != os.getpid() or not os.path.isfile(segment_path)
+                or os.path.getsize(segment_path) >= config.archive_segment_size):
+            self.segment = f"{socket.gethostname()}-{os.getpid()}-{time.time_ns()}.seg"
+            self.segment_pid = os.getpid()
+            open(f"{self.folder}/{self.segment}", "ab").close()
+        return self.segment
+
+    def add(self, pages: list[tuple[str, bytes, int, str | None]]) -> None:
+        """Append pages (url, content, status and encoding) to the archive."""
+        if not pages:
+            return
+        fetched_at = time.time()
+        with closing(self.connect()) as connection:
+            segment = self.get_segment()
+            rows = []
+            with open(f"{self.folder}/{segment}", "ab") as file:
+                for url, content, status, encoding in pages:
+                    data = zlib.compress(content, config.archive_compression_level)
+                    rows.append((url, fetched_at, segment, file.tell(), len(data), status, encoding))
+                    file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            with connection:
+                connection.executemany("INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.prune(connection)
+
+    def prune(self, connection: sqlite3.Connection) -> None:
+        """Delete the oldest segments (except the current one) until the archive does not exceed the maximal size. The
+        pages of a segment are removed from the index before the segment is deleted."""
+        segments = sorted(glob.glob(f"{self.folder}/*.seg"), key=os.path.getmtime)
+        size = sum(map(os.path.getsize, segments))
+        for segment in segments:
+            if size <= config.archive_max_size:
+                break
+            name = os.path.basename(segment)
+            if name == self.segment:
+                continue
+            with connection:
+                connection.execute("DELETE FROM pages WHERE segment = ?", (name,))
+            size -= os.path.getsize(segment)
+            os.remove(segment)
+
+    def get_pages(self, urls: list[str], until: float = None) -> list[tuple[bytes, int, str | None] | None]:
+        """Get the content, status and encoding of the latest archived version of each page. If a time (time.time())
+        is passed, the latest versions fetched before it are returned. Pages that were not archived are None."""
+        if not os.path.isfile(self.index_file):
+            return len(urls) * [None]
+        pages = []
+        files = {}
+        with closing(self.connect()) as connection:
+            for url in urls:
+                row = connection.execute("SELECT segment, offset, length, status, encoding FROM pages WHERE url = ? "
+                                         "AND fetched_at <= ? ORDER BY fetched_at DESC LIMIT 1",
+                                         (url, until if until is not None else float("inf"))).fetchone()
+                if row is None:
+                    pages.append(None)
+                    continue
+                segment, offset, length, status, encoding = row
+                if segment not in files:
+                    files[segment] = open(f"{self.folder}/{segment}", "rb")
+                files[segment].seek(offset)
+                pages.append((zlib.decompress(files[segment].read(length)), status, encoding))
+        for file in files.values():
+            file.close()
+        return pages
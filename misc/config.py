@@ -7,6 +7,72 @@ proxies = {
     "https": https_proxy
 }
 
+verify_ssl = True
+
+# pool of egress proxies, e.g. ["http://proxy-1:3128", "http://proxy-2:3128"], which replaces the proxies above
+proxy_pool = []
+proxy_strategy = "round_robin"  # assignment of the requests to the proxies, "round_robin" or "least_loaded"
+proxy_ban_time = 600.  # seconds a proxy is not used for a host, after the host rejected it (429 or rejection page)
+proxy_failure_threshold = 3  # consecutive connection errors after which a proxy is taken out of rotation
+proxy_recovery_time = 60.  # seconds until a proxy with connection errors is used again
+
+# request handling
+request_timeout = 30  # seconds to wait for connecting to or reading from a server
+max_retries = 3  # number of retries for transient errors (timeouts, disconnects, 429 and 5xx responses)
+retry_backoff = 1.  # base delay in seconds of the jittered exponential backoff
+max_retry_backoff = 30.  # upper bound of a single backoff delay
+circuit_breaker_threshold = 10  # consecutive failures after which requests to a domain are stopped
+circuit_breaker_reset = 60.  # seconds until a stopped domain is probed again
+
+# transports of the asynchronous requests, the http2 transport multiplexes the requests to a host over a single
+# connection and requires the optional dependency httpx[http2]
+default_transport = "aiohttp"
+domain_transports = {}  # domain or core domain to transport, e.g. {"papers.nips.cc": "http2"}
+http2_max_streams = 50  # number of simultaneous requests of the http2 transport
+
+parse_workers = None  # number of processes to parse the feed sources, None uses the number of CPUs
+
+# notes api of OpenReview (see parsers.conferences.openreview), e.g. a local mirror
+openreview_api_url = "https://api2.openreview.net"
+openreview_api_v1_url = "https://api.openreview.net"  # api of the venues before 2024
+openreview_page_size = 1000  # notes per request, which is the maximum of the api
+
 config_file = "misc/config.yaml"
 
 result_feed_folder = "result_feeds"
+
+retry_queue_file = f"{result_feed_folder}/retry_queue.json"
+
+validators_file = f"{result_feed_folder}/validators.json"  # ETag and Last-Modified of the retrieved conference pages
+
+dedup_history_file = f"{result_feed_folder}/dedup_history.npz"
+
+# archive of the raw pages of all requests (see misc.archive), which allows to extract the papers again offline
+archive_pages = True
+archive_folder = "archive"  # kept apart from the published result feeds
+archive_segment_size = 2 ** 28  # bytes after which a new segment file is started
+archive_max_size = 2 ** 33  # bytes of all segments, beyond which the oldest segments are deleted
+credential_params = ["apikey", "api_key"]  # query parameters (case-insensitive) that are removed from archived urls
+archive_compression_level = 6  # zlib level of the pages
+
+# inverted index over the papers of all generated feeds (see misc.search_index and search_feeds.py)
+index_feeds = True
+search_index_folder = "search_index"  # kept apart from the published result feeds
+search_index_max_segments = 8  # number of segments after which they are merged into one
+
+# profiling of the stages of a run with the flag --profiling (see misc.profiling), one directory per run
+profile_folder = "profiles"
+profile_sample_interval = 0.005  # seconds between the stack samples of the cpu mode
+profile_traceback_depth = 10  # frames stored per allocation in the mem mode
+profile_top_allocators = 25  # number of allocation sites that are reported per stage
+
+activation_state_file = "scholar_activation.json"  # holds the private inbox urls, kept apart from the result feeds
+activation_backoff = 3600.  # base delay in seconds before an inbox with a failed activation is tried again
+activation_concurrency = 2  # confirmation requests to Google Scholar that are sent at once
+activation_interval = 2.  # seconds between the groups of confirmation requests
+
+# sharded conference crawls (see misc.work_queue), the queue file can be placed on a shared filesystem
+work_queue_file = f"{result_feed_folder}/work_queue.sqlite"
+lease_duration = 300.  # seconds until a shard of a worker without heartbeat is handed to another worker
+heartbeat_interval = 60.  # seconds between the lease renewals of a working worker
+max_shard_attempts = 3  # number of leases after which a shard is marked as failed
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import os
+import re
+import zlib
+import numpy as np
+from misc import config
+from misc.utils import Paper
+
+n_permutations = 128
+n_bands = 16  # rows per band = n_permutations / n_bands, which results in a similarity threshold of roughly 0.7
+similarity_threshold = 0.8  # minimal estimated jaccard similarity of near duplicates
+prime = 2 ** 31 - 1
+
+rng = np.random.default_rng(0)  # fixed seed, as the signatures of previous runs are stored
+permutation_a = rng.integers(1, prime, n_permutations, dtype=np.int64)
+permutation_b = rng.integers(0, prime, n_permutations, dtype=np.int64)
+band_multipliers = rng.integers(1, 2 ** 63, n_permutations // n_bands, dtype=np.uint64)
+
+
+def normalize_title(title: str) -> str:
+    """Normalize the title, so formatting differences of the publishers are neglected."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", title.lower()).split())
+
+
+def get_shingles(paper: Paper) -> set[str]:
+    """Get the word and word pair shingles of the normalized title and the last names of the authors."""
+    words = normalize_title(paper.title).split()
+    shingles = set(words)
+    shingles.update(map(" ".join, zip(words[:-1], words[1:])))
+    shingles.update(f"author:{author.split()[-1].lower()}" for author in paper.authors if author.split())
+    return shingles
+
+
+def get_signatures(papers: list[Paper], chunk_size: int = 1000) -> np.ndarray:
+    """Compute the MinHash signatures of the shingles of the papers. The papers are processed in chunks, in which all
+    shingles are hashed at once. Papers without shingles get an invalid signature (-1)."""
+    signatures = np.full((len(papers), n_permutations), -1, dtype=np.int64)
+    for start in range(0, len(papers), chunk_size):
+        all_shingles = [get_shingles(paper) for paper in papers[start:start + chunk_size]]
+        lengths = np.fromiter(map(len, all_shingles), dtype=np.int64, count=len(all_shingles))
+        valid = np.flatnonzero(lengths)
+        if len(valid) == 0:
+            continue
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) % prime
+                              for shingles in all_shingles for shingle in shingles), dtype=np.int64)
+        permuted = (permutation_a[:, None] * hashes[None, :] + permutation_b[:, None]) % prime
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])[valid]
+        signatures[start + valid] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def get_band_keys(signatures: np.ndarray) -> np.ndarray:
+    """Hash each band of the signatures into a single key (locality-sensitive hashing)."""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), n_bands, -1)
+    return (bands * band_multipliers).sum(axis=2)  # overflow is intended
+
+
+class NearDuplicateDetector:
+    """Detect near duplicates (e.g. the arxiv, IEEE and CVF version of the same work) based on MinHash signatures of
+    the titles and authors. Candidates are found with locality-sensitive hashing by sorting the band keys, which avoids
+    comparing all pairs. The signatures of all kept papers are stored, so new papers are compared against the history
+    of previous runs as well."""
+    def __init__(self, history_file: str = None) -> None:
+        self.history_file = history_file or config.dedup_history_file
+        self.history_links = np.array([], dtype=str)
+        self.history_signatures = np.zeros((0, n_permutations), dtype=np.int32)
+        if os.path.isfile(self.history_file):
+            history = np.load(self.history_file)
+            self.history_links = history["links"]
+            self.history_signatures = history["signatures"]
+
+    def find_groups(self, papers: list[Paper]) -> list[list[int]]:
+        """Group the indices of papers that are near duplicates of each other. Papers that are near duplicates of a
+        paper in the history, which is not part of the papers, are grouped with the index -1."""
+        signatures = get_signatures(papers)
+        # history entries of the current papers are represented by the papers themselves
+        history = ~np.isin(self.history_links, [paper.link for paper in papers])
+        all_signatures = np.concatenate([signatures, self.history_signatures[history].astype(np.int64)])
+        n_papers = len(papers)
+        valid = np.concatenate([signatures[:, 0] != -1, np.ones(history.sum(), dtype=bool)])
+
+        # near duplicates share the key of at least one band, thus they are neighbors after sorting the keys
+        parents = list(range(len(all_signatures)))
+        linked = set()
+        band_keys = get_band_keys(all_signatures)
+        for band in range(n_bands):
+            order = np.argsort(band_keys[:, band], kind="stable")
+            sorted_keys = band_keys[order, band]
+            neighbors = np.flatnonzero(sorted_keys[:-1] == sorted_keys[1:])
+            first, second = order[neighbors], order[neighbors + 1]
+            candidates = (valid[first] & valid[second]) & ((first < n_papers) | (second < n_papers))
+            first, second = first[candidates], second[candidates]
+            similarities = (all_signatures[first] == all_signatures[second]).mean(axis=1)
+            for idx_a, idx_b in zip(first[similarities >= similarity_threshold],
+                                    second[similarities >= similarity_threshold]):
+                parents[find_root(parents, idx_a)] = find_root(parents, idx_b)
+                linked.update((idx_a, idx_b))
+
+        groups = {}
+        for idx in linked:
+            groups.setdefault(find_root(parents, idx), []).append(idx if idx < n_papers else -1)
+        return [sorted(set(group)) for group in groups.values() if len(group) > 1 and max(group) >= 0]
+
+    def update_history(self, papers: list[Paper]) -> None:
+        """Store the signatures of the papers, so they are considered in the following runs."""
+        history_links = set(self.history_links)
+        new_papers = [paper for paper in papers if paper.link not in history_links]
+        signatures = get_signatures(new_papers)
+        valid = signatures[:, 0] != -1
+        if not valid.any():
+            return
+        new_papers = [paper for paper, is_valid in zip(new_papers, valid) if is_valid]
+        signatures = signatures[valid]
+        self.history_links = np.concatenate([self.history_links, [paper.link for paper in new_papers]])
+        # the signatures are stored uncompressed, as the hash values are hardly compressible
+        self.history_signatures = np.concatenate([self.history_signatures, signatures.astype(np.int32)])
+        np.savez(self.history_file, links=self.history_links, signatures=self.history_signatures)
+
+
+def find_root(parents: list[int], idx: int) -> int:
+    """Find the root of an element in the union-find structure."""
+    while parents[idx] != idx:
+        parents[idx] = parents[parents[idx]]
+        idx = parents[idx]
+    return idx
+
+
+def get_richness(paper: Paper) -> tuple[int, int, int]:
+    """Rank the metadata of a paper, e.g. an enriched arxiv entry is preferred over a bare Google Scholar entry."""
+    return bool(paper.abstract), len(paper.authors), len(paper.abstract)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import re
+from misc import utils
+from misc.settings import FilterSettings
+
+
+class PaperFilter:
+    """Rule based filter, which is applied on the fields that are available before any paper information is requested
+    (title, authors and link). Papers that do not pass are either dropped or deferred, i.e. kept without requesting
+    further information.
+
+    The rules are checked in the following order:
+    1. Papers from denied domains or from domains outside of the allowed ones are rejected.
+    2. Papers with a denied author are rejected.
+    3. Papers with an allowed author are accepted.
+    4. If title keywords or regexes are set, the title has to match one of them.
+    """
+    actions = ["drop", "defer"]
+
+    def __init__(self, title_keywords: list[str] = None, title_regex: list[str] = None, authors_allow: list[str] = None,
+                 authors_deny: list[str] = None, domains_allow: list[str] = None, domains_deny: list[str] = None,
+                 action: str = "drop") -> None:
+        if action not in self.actions:
+            raise ValueError(f"The filter action '{action}' is not supported. Use one of {self.actions}.")
+        self.title_keywords = [keyword.lower() for keyword in title_keywords or []]
+        self.title_regex = [re.compile(pattern, re.IGNORECASE) for pattern in title_regex or []]
+        self.authors_allow = set(map(normalize_author, authors_allow or []))
+        self.authors_deny = set(map(normalize_author, authors_deny or []))
+        self.domains_allow = set(domains_allow or [])
+        self.domains_deny = set(domains_deny or [])
+        self.action = action
+
+    @classmethod
+    def from_settings(cls, settings: FilterSettings) -> PaperFilter:
+        """Create the filter based on the filters defined in the config file."""
+        return cls(list(settings.title_keywords), list(settings.title_regex), list(settings.authors_allow),
+                   list(settings.authors_deny), list(settings.domains_allow), list(settings.domains_deny),
+                   settings.action)
+
+    @property
+    def is_active(self) -> bool:
+        """Return whether any rule is defined."""
+        return any([self.title_keywords, self.title_regex, self.authors_allow, self.authors_deny, self.domains_allow,
+                    self.domains_deny])
+
+    @property
+    def defers(self) -> bool:
+        """Return whether rejected papers are deferred instead of dropped."""
+        return self.action == "defer"
+
+    def check(self, title: str, authors: list[str], link: str) -> bool:
+        """Check if a paper passes the rules."""
+        domain = utils.get_core_domain(link)
+        if domain in self.domains_deny or (self.domains_allow and domain not in self.domains_allow):
+            return False
+
+        authors = set(map(normalize_author, authors))
+        if authors & self.authors_deny:
+            return False
+        if authors & self.authors_allow:
+            return True
+
+        if self.title_keywords or self.title_regex:
+            lower_title = title.lower()
+            return (any(keyword in lower_title for keyword in self.title_keywords)
+                    or any(pattern.search(title) for pattern in self.title_regex))
+        return True
+
+
+def normalize_author(author: str) -> str:
+    """Normalize the author name to allow a robust comparison."""
+    return " ".join(author.lower().split())
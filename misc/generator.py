@@ -1,5 +1,5 @@
 from xml.sax.saxutils import escape
-from misc import config
+from misc import config, search_index
 from misc.utils import Paper
 
 
@@ -17,13 +17,23 @@ def gen_entry(paper: Paper) -> str:
     for author in paper.authors:
         authors_entry += f"<author><name>{author}</name></author>"
 
+    source_entry = ""
+    if paper.source:
+        source_entry = f'<link href="{escape_xml(paper.source)}" rel="via" type="text/html"/> '
+
+    score_entry = ""
+    if paper.score is not None:
+        score_entry = f'<category scheme="relevance" term="{paper.score:.4f}"/> '
+
     return f'<entry> ' \
            f'<id>{escape_xml(paper.link)}</id>' \
            f'<title>{escape_xml(paper.title)}</title> ' \
            f'<summary>{escape_xml(paper.abstract.strip())} </summary> ' \
            f'{authors_entry} ' \
+           f'{score_entry}' \
            f'<link href="{escape_xml(paper.link)}" rel="alternate" type="text/html"/>  ' \
            f'<link title="pdf" href="{escape_xml(paper.link)}" rel="related" type="application/pdf"/>' \
+           f'{source_entry}' \
            f'</entry>'
 
 
@@ -41,8 +51,9 @@ def gen_atom_feed(papers: list[Paper]) -> str:
            f'</feed>'
 
 
-def create_atom_feed(papers: list[Paper], result_file_name=None, conference=None, year=None) -> None:
-    """Create an atom feed file (xml format) and store it."""
+def create_atom_feed(papers: list[Paper], result_file_name=None, conference=None, year=None, index=True) -> None:
+    """Create an atom feed file (xml format) and store it. The papers of the feed are updated in the search index,
+    unless index is disabled (e.g. for feeds of search results)."""
     atom_feed = gen_atom_feed(papers)
 
     if result_file_name:
@@ -55,3 +66,6 @@ def create_atom_feed(papers: list[Paper], result_file_name=None, conference=None
     with open(f"{config.result_feed_folder}/{file_name}", "w", encoding="utf-8") as f:
         f.write(atom_feed)
 
+    if index and config.index_feeds:
+        search_index.SearchIndex().update(file_name, papers)
+
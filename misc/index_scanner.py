@@ -0,0 +1,68 @@
+from __future__ import annotations
+import html
+import re
+from typing import Callable, Iterator
+import bs4
+from misc import utils
+
+index_cache = {}  # url to the raw index page, so pages that list multiple years are requested once per run
+comment_pattern = re.compile(r"<!--.*?-->", re.DOTALL)
+link_pattern = re.compile(r"""<a\b[^>]*?(?<![\w-])href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+))""", re.IGNORECASE)
+
+
+def get_index(url: str) -> utils.FetchResult:
+    """Get the raw index page of a conference, which is solely requested once per run."""
+    if url not in index_cache:
+        index_cache[url] = utils.get_url_content(url)
+    return index_cache[url]
+
+
+def iter_elements(text: str, tag: str, class_name: str = None, link_filter: Callable[[str], bool] = None,
+                  following: str = None) -> Iterator[str]:
+    """Scan the html source for the elements of a tag (and class) and yield their source, without building a tree of
+    the page. If a link filter is passed, solely elements whose first link passes it are yielded. If a following tag is
+    passed, an element of it that directly follows an element is yielded along with it (e.g. the authors of a title).
+    The elements must not be nested into each other and comments have to be removed beforehand."""
+    if class_name:
+        # the class is one of the (quoted) classes of the attribute or the unquoted value
+        name = rf"(?<![\w-]){re.escape(class_name)}(?![\w-])"
+        class_pattern = rf"""[^>]*?(?<![\w-])class\s*=\s*(?:"[^"]*{name}[^"]*"|'[^']*{name}[^']*'|{name}(?=[\s/>]))"""
+    else:
+        class_pattern = ""
+    start_pattern = re.compile(rf"<{tag}\b{class_pattern}[^>]*>", re.IGNORECASE)
+    end_pattern = re.compile(rf"</{tag}\s*>", re.IGNORECASE)
+    if following:
+        following_pattern = re.compile(rf"\s*<{following}\b[^>]*>", re.IGNORECASE)
+        following_end_pattern = re.compile(rf"</{following}\s*>", re.IGNORECASE)
+    position = 0
+    while match := start_pattern.search(text, position):
+        end = end_pattern.search(text, match.end())
+        position = end.end() if end else len(text)
+        if following and (following_match := following_pattern.match(text, position)):
+            end = following_end_pattern.search(text, following_match.end())
+            position = end.end() if end else len(text)
+        element = text[match.start():position]
+        if link_filter is not None:
+            link = link_pattern.search(element)
+            # the href is either double, single or not quoted
+            href = link and next(group for group in link.groups() if group is not None)
+            if href is None or not link_filter(html.unescape(href)):
+                continue
+        yield element
+
+
+def get_containers(url: str, tag: str, class_name: str = None, section: tuple[str, str] = None,
+                   link_filter: Callable[[str], bool] = None, following: str = None) -> list[bs4.element.Tag]:
+    """Get the paper containers of an index page. The page is scanned for the elements of the tag and class, optionally
+    solely within the first element of a section (tag and class), and filtered by their links (e.g. by the year).
+    Solely the matching elements are parsed into bs4 elements, which saves the time and memory of a tree of the whole
+    page. The elements of the following tag that directly follow the containers are kept as their next siblings."""
+    result = get_index(url)
+    text = comment_pattern.sub("", result.content.decode(result.encoding or "utf-8", errors="replace"))
+    if section is not None:
+        text = next(iter_elements(text, *section), "")
+    elements = list(iter_elements(text, tag, class_name, link_filter, following))
+    if not elements:
+        return []
+    soup = bs4.BeautifulSoup("".join(elements), features="lxml")
+    return soup.find_all(tag, class_=class_name) if class_name else soup.find_all(tag)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+from misc import config
+
+modes = ["cpu", "mem"]
+profiler = None  # profiler of the current run, stages are not profiled without it
+
+
+class StackSampler(threading.Thread):
+    """Sample the call stack of a thread periodically and count the collapsed stacks, which is the input format of
+    flame graph tools (e.g. flamegraph.pl or speedscope)."""
+    def __init__(self, thread_id: int) -> None:
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(config.profile_sample_interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+    def dump(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Profile the stages of a run (e.g. fetching and parsing) separately. The results are stored in a directory per
+    run, the files of each stage are prefixed with its position.
+
+    cpu: cProfile statistics (.prof, e.g. for pstats or snakeviz) and sampled collapsed stacks (.folded) for flame
+    graphs.
+    mem: tracemalloc snapshots before and after each stage, the top allocators of the stage are stored (.txt).
+    """
+    def __init__(self, mode: str, name: str) -> None:
+        if mode not in modes:
+            raise ValueError(f"The profiling mode '{mode}' is not supported. Use one of {modes}.")
+        self.mode = mode
+        self.pid = os.getpid()  # child processes (e.g. forked workers) are not profiled
+        # the pid separates runs that are started in the same second
+        self.folder = f"{config.profile_folder}/{name}_{time.strftime('%Y%m%d_%H%M%S')}_{self.pid}"
+        os.makedirs(self.folder)
+        self.summary = []
+        if self.mode == "mem":
+            tracemalloc.start(config.profile_traceback_depth)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        file_path = f"{self.folder}/{len(self.summary) + 1:02d}_{name}"
+        start = time.perf_counter()
+        if self.mode == "cpu":
+            sampler = StackSampler(threading.get_ident())
+            profile = cProfile.Profile()
+            sampler.start()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                sampler.stop()
+                profile.dump_stats(f"{file_path}.prof")
+                sampler.dump(f"{file_path}.folded")
+                self.summary.append(f"{name}: {time.perf_counter() - start:.3f} s")
+        else:
+            tracemalloc.reset_peak()
+            before = self.take_snapshot()
+            try:
+                yield
+            finally:
+                after = self.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                statistics = after.compare_to(before, "lineno")
+                with open(f"{file_path}.txt", "w", encoding="utf-8") as file:
+                    file.write(f"peak: {peak / 2 ** 20:.1f} MiB\n")
+                    file.writelines(f"{statistic}\n" for statistic in statistics[:config.profile_top_allocators])
+                size_diff = sum(statistic.size_diff for statistic in statistics)
+                self.summary.append(f"{name}: {time.perf_counter() - start:.3f} s, peak {peak / 2 ** 20:.1f} MiB, "
+                                    f"retained {size_diff / 2 ** 20:+.1f} MiB")
+
+    @staticmethod
+    def take_snapshot() -> tracemalloc.Snapshot:
+        # the allocations of tracemalloc itself are excluded
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def close(self) -> None:
+        """Store the summary of the stages."""
+        if self.mode == "mem":
+            tracemalloc.stop()
+        with open(f"{self.folder}/summary.txt", "w", encoding="utf-8") as file:
+            file.writelines(f"{idx + 1:02d} {line}\n" for idx, line in enumerate(self.summary))
+        print(f"Profiling results are stored in {self.folder}.")
+
+
+def start(mode: str | None, name: str) -> None:
+    """Start profiling the stages of a run, if a mode is set."""
+    global profiler
+    profiler = Profiler(mode, name) if mode else None
+
+
+def stop() -> None:
+    global profiler
+    if profiler is not None:
+        profiler.close()
+        profiler = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Profile a stage of the run. Stages must not be nested."""
+    if profiler is None or profiler.pid != os.getpid():
+        yield
+    else:
+        with profiler.stage(name):
+            yield
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import itertools
+import re
+import numpy as np
+from misc.settings import RankingProfile, Settings
+from misc.utils import Paper
+
+token_pattern = re.compile(r"[a-z0-9]{2,}")
+stop_words = [
+    "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or", "our", "that", "the",
+    "this", "to", "we", "with"
+]
+
+
+def hash_tokens(text: str) -> np.ndarray:
+    """Split the text into lower case word tokens and hash them."""
+    return np.fromiter(map(hash, token_pattern.findall(text.lower())), dtype=np.int64)
+
+
+class Ranker:
+    """Rank papers based on their relevance for keyword or seed paper profiles. Titles and abstracts are converted into
+    a hashed bag-of-words TF-IDF matrix (stored as sparse coordinate arrays), which allows to score large paper
+    collections vectorized. The score of a paper is the maximal cosine similarity to one of the profiles."""
+    def __init__(self, profiles: list[RankingProfile]) -> None:
+        # each profile consists of keywords and/or seed texts (title and abstract of relevant papers)
+        self.profile_texts = [" ".join(profile.keywords + profile.seeds) for profile in profiles]
+        if not any(self.profile_texts):
+            raise ValueError("The selected ranking profiles neither contain keywords nor seed papers.")
+        self.stop_word_hashes = np.fromiter(map(hash, stop_words), dtype=np.int64)
+
+    @classmethod
+    def from_settings(cls, settings: Settings, names: list[str]) -> Ranker:
+        """Create the ranker based on the selected profiles of the config file."""
+        missing = [name for name in names if settings.get_ranking_profile(name) is None]
+        if missing:
+            raise ValueError(f"The ranking profiles {missing} are not defined in the config file.")
+        return cls([settings.get_ranking_profile(name) for name in names])
+
+    def score(self, papers: list[Paper]) -> np.ndarray:
+        """Compute the relevance score of each paper."""
+        n_papers = len(papers)
+        if n_papers == 0:
+            return np.zeros(0)
+
+        # hash the tokens of all papers and map the hashes to term ids
+        paper_tokens = [token_pattern.findall(f"{paper.title} {paper.abstract}".lower()) for paper in papers]
+        lengths = np.fromiter(map(len, paper_tokens), dtype=np.int64, count=n_papers)
+        hashes = np.fromiter(map(hash, itertools.chain.from_iterable(paper_tokens)), dtype=np.int64,
+                             count=int(lengths.sum()))
+        rows = np.repeat(np.arange(n_papers), lengths)
+        relevant = ~np.isin(hashes, self.stop_word_hashes)
+        terms, cols = np.unique(hashes[relevant], return_inverse=True)
+        if len(terms) == 0:  # no paper contains a relevant token
+            return np.zeros(n_papers)
+        rows = rows[relevant]
+        n_terms = len(terms)
+
+        # term frequencies of the unique (paper, term) pairs
+        keys, counts = np.unique(rows * n_terms + cols, return_counts=True)
+        rows, cols = keys // n_terms, keys % n_terms
+        idf = np.log((1 + n_papers) / (1 + np.bincount(cols, minlength=n_terms))) + 1
+        weights = (1 + np.log(counts)) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_papers))
+        norms[norms == 0] = 1
+
+        scores = np.zeros(n_papers)
+        for text in self.profile_texts:
+            profile = np.zeros(n_terms)
+            profile_hashes = hash_tokens(text)
+            term_ids = np.searchsorted(terms, profile_hashes).clip(max=len(terms) - 1)
+            np.add.at(profile, term_ids[terms[term_ids] == profile_hashes], 1)
+            profile[profile > 0] = (1 + np.log(profile[profile > 0])) * idf[profile > 0]
+            profile_norm = np.linalg.norm(profile)
+            if profile_norm == 0:
+                continue
+            similarities = np.bincount(rows, weights=weights * profile[cols], minlength=n_papers) / norms
+            scores = np.maximum(scores, similarities / profile_norm)
+        return scores
+
+    def rank(self, papers: list[Paper], top_k: int = None) -> list[Paper]:
+        """Assign the relevance score to each paper. If top_k is set, solely the top k papers are returned sorted by
+        their score, otherwise all papers are returned in their original order."""
+        scores = self.score(papers)
+        for paper, score in zip(papers, scores):
+            paper.score = float(score)
+        if top_k is None:
+            return papers
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [papers[idx] for idx in order]
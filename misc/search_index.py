@@ -0,0 +1,263 @@
+from __future__ import annotations
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import numpy as np
+from misc import config
+from misc.filters import normalize_author
+from misc.ranking import stop_words, token_pattern
+from misc.utils import Paper
+
+max_term_length = 32  # longer tokens are truncated, as the terms are stored with a fixed width
+year_pattern = re.compile(r"_(\d{4})\.xml$")  # year in the names of the conference feeds, e.g. CVPR_2023.xml
+
+
+def get_terms(doc: dict) -> set[str]:
+    """Get the terms of a paper, which are the tokens of the title and abstract and the prefixed author tokens."""
+    terms = {token[:max_term_length] for token in token_pattern.findall(f"{doc['title']} {doc['abstract']}".lower())}
+    terms.difference_update(stop_words)
+    terms.update(f"author:{token}"[:max_term_length] for author in doc["authors"]
+                 for token in token_pattern.findall(author.lower()))
+    return terms
+
+
+def get_doc(paper: Paper) -> dict:
+    return {"title": paper.title, "authors": paper.authors, "abstract": paper.abstract, "link": paper.link,
+            "source": paper.source}
+
+
+def get_key(doc: dict) -> int:
+    """Get a stable hash of the content of a paper, which identifies unchanged papers in later updates."""
+    return int.from_bytes(hashlib.blake2b(json.dumps(doc, sort_keys=True).encode("utf-8"), digest_size=8).digest(),
+                          "little")
+
+
+def get_year(feed: str) -> int | None:
+    match = year_pattern.search(feed)
+    return int(match.group(1)) if match else None
+
+
+class Segment:
+    """Immutable part of the index, which contains the postings and documents of the papers added by an update. The
+    arrays are memory mapped, so a query solely reads the postings of its terms and the documents of its matches.
+    Papers that are removed or changed in later updates are solely marked as deleted."""
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        with open(f"{folder}/meta.json", "r", encoding="utf-8") as file:
+            self.feeds = json.load(file)["feeds"]
+        self.terms = self.load("terms")
+        self.offsets = self.load("offsets")
+        self.postings = self.load("postings")
+        self.doc_offsets = self.load("doc_offsets")
+        self.feed_codes = self.load("feed_codes")
+        self.keys = self.load("keys")
+        self.deleted = np.load(f"{folder}/deleted.npy") if os.path.isfile(f"{folder}/deleted.npy") else \
+            np.zeros(len(self.keys), dtype=bool)
+
+    def load(self, name: str) -> np.ndarray:
+        return np.load(f"{self.folder}/{name}.npy", mmap_mode="r")
+
+    @classmethod
+    def write(cls, folder: str, docs: list[dict], feeds: list[str]) -> Segment:
+        """Build the postings of the documents (with the names of their feeds) and store them."""
+        os.makedirs(folder)
+        doc_terms = [list(get_terms(doc)) for doc in docs]
+        lengths = np.fromiter(map(len, doc_terms), dtype=np.int64, count=len(docs))
+        all_terms = np.array(list(itertools.chain.from_iterable(doc_terms)), dtype=str)
+        doc_ids = np.repeat(np.arange(len(docs), dtype=np.int32), lengths)
+        terms, term_ids = np.unique(all_terms, return_inverse=True)
+        order = np.lexsort((doc_ids, term_ids))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(term_ids, minlength=len(terms)))])
+
+        contents = [json.dumps(doc).encode("utf-8") for doc in docs]
+        with open(f"{folder}/docs.bin", "wb") as file:
+            file.write(b"".join(contents))
+        feed_names = sorted(set(feeds))
+        feed_codes = np.searchsorted(feed_names, feeds).astype(np.int32)
+        arrays = {"terms": terms, "offsets": offsets, "postings": doc_ids[order],
+                  "doc_offsets": np.concatenate([[0], np.cumsum(list(map(len, contents)), dtype=np.int64)]),
+                  "feed_codes": feed_codes, "keys": np.array(list(map(get_key, docs)), dtype=np.uint64)}
+        return cls.save(folder, arrays, feed_names)
+
+    @classmethod
+    def merge(cls, folder: str, segments: list[Segment]) -> Segment:
+        """Merge the live documents of segments into a new segment. The postings are combined directly, so the
+        documents are not tokenized again."""
+        os.makedirs(folder)
+        terms = np.unique(np.concatenate([segment.terms for segment in segments]))
+        feed_names = sorted(set(itertools.chain.from_iterable(segment.feeds for segment in segments)))
+        all_term_ids, all_doc_ids, feed_codes, keys, doc_lengths = [], [], [], [], []
+        n_docs = 0
+        with open(f"{folder}/docs.bin", "wb") as file:
+            for segment in segments:
+                live = ~segment.deleted
+                # ids of the live documents in the merged segment
+                new_ids = np.cumsum(live, dtype=np.int64) - 1 + n_docs
+                term_ids = np.repeat(np.searchsorted(terms, segment.terms), np.diff(segment.offsets))
+                postings = np.asarray(segment.postings)
+                kept = live[postings]
+                all_term_ids.append(term_ids[kept])
+                all_doc_ids.append(new_ids[postings[kept]].astype(np.int32))
+
+                live_ids = np.flatnonzero(live)
+                feed_map = np.searchsorted(feed_names, segment.feeds).astype(np.int32)
+                feed_codes.append(feed_map[segment.feed_codes[live_ids]])
+                keys.append(segment.keys[live_ids])
+                doc_lengths.append(np.diff(segment.doc_offsets)[live_ids])
+                with open(f"{segment.folder}/docs.bin", "rb") as segment_file:
+                    for start, length in zip(segment.doc_offsets[live_ids], doc_lengths[-1]):
+                        segment_file.seek(start)
+                        file.write(segment_file.read(length))
+                n_docs += len(live_ids)
+
+        term_ids = np.concatenate(all_term_ids)
+        # the documents of the segments are in ascending order, thus a stable sort keeps them sorted per term
+        order = np.argsort(term_ids, kind="stable")
+        arrays = {"terms": terms, "offsets": np.concatenate([[0], np.cumsum(np.bincount(term_ids,
+                                                                                          minlength=len(terms)))]),
+                  "postings": np.concatenate(all_doc_ids)[order],
+                  "doc_offsets": np.concatenate([[0], np.cumsum(np.concatenate(doc_lengths), dtype=np.int64)]),
+                  "feed_codes": np.concatenate(feed_codes), "keys": np.concatenate(keys).astype(np.uint64)}
+        return cls.save(folder, arrays, feed_names)
+
+    @classmethod
+    def save(cls, folder: str, arrays: dict[str, np.ndarray], feed_names: list[str]) -> Segment:
+        for name, array in arrays.items():
+            np.save(f"{folder}/{name}.npy", array)
+        with open(f"{folder}/meta.json", "w", encoding="utf-8") as file:
+            json.dump({"feeds": feed_names}, file)
+        return cls(folder)
+
+    def save_deleted(self) -> None:
+        with open(f"{self.folder}/deleted.tmp", "wb") as file:
+            np.save(file, self.deleted)
+        os.replace(f"{self.folder}/deleted.tmp", f"{self.folder}/deleted.npy")
+
+    def get_feed_mask(self, feed: str) -> np.ndarray:
+        """Get the live documents of a feed."""
+        if feed not in self.feeds:
+            return np.zeros(len(self.keys), dtype=bool)
+        return (self.feed_codes == self.feeds.index(feed)) & ~self.deleted
+
+    def get_postings(self, term: str) -> np.ndarray:
+        idx = np.searchsorted(self.terms, term)
+        if idx == len(self.terms) or self.terms[idx] != term:
+            return np.zeros(0, dtype=np.int32)
+        return np.asarray(self.postings[self.offsets[idx]:self.offsets[idx + 1]])
+
+    def search(self, terms: list[str], feeds: list[str]) -> np.ndarray:
+        """Get the live documents that contain all terms and belong to one of the feeds."""
+        codes = [code for code, feed in enumerate(self.feeds) if feed in feeds]
+        if not codes:
+            return np.zeros(0, dtype=np.int32)
+        doc_ids = None
+        # the rarest terms are intersected first
+        for postings in sorted(map(self.get_postings, terms), key=len):
+            doc_ids = postings if doc_ids is None else np.intersect1d(doc_ids, postings, assume_unique=True)
+            if len(doc_ids) == 0:
+                return doc_ids
+        if doc_ids is None:
+            doc_ids = np.arange(len(self.keys), dtype=np.int32)
+        return doc_ids[np.isin(self.feed_codes[doc_ids], codes) & ~self.deleted[doc_ids]]
+
+    def get_docs(self, doc_ids: np.ndarray) -> list[dict]:
+        docs = []
+        with open(f"{self.folder}/docs.bin", "rb") as file:
+            for doc_id in doc_ids:
+                file.seek(self.doc_offsets[doc_id])
+                docs.append(json.loads(file.read(self.doc_offsets[doc_id + 1] - self.doc_offsets[doc_id])))
+        return docs
+
+
+class SearchIndex:
+    """Inverted index over the titles, abstracts and authors of the papers of all generated feeds. The index is updated
+    with each generated feed: papers that are new or changed are added as a new segment, while papers that were removed
+    or changed are marked as deleted in their segments. If there are too many segments, they are merged into one.
+
+    The manifest lists the current segments and is replaced atomically, so queries never see partially written
+    segments. The index assumes a single writer at a time."""
+    def __init__(self, folder: str = None) -> None:
+        self.folder = folder or config.search_index_folder
+        self.manifest_file = f"{self.folder}/manifest.json"
+        self.manifest = {"segments": [], "next_segment": 0}
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file, "r", encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        self.segments = [Segment(f"{self.folder}/{name}") for name in self.manifest["segments"]]
+
+    @property
+    def feeds(self) -> list[str]:
+        """Get the names of all indexed feeds."""
+        return sorted(set(itertools.chain.from_iterable(segment.feeds for segment in self.segments)))
+
+    def save_manifest(self) -> None:
+        self.manifest["segments"] = [os.path.basename(segment.folder) for segment in self.segments]
+        with open(f"{self.manifest_file}.tmp", "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file)
+        os.replace(f"{self.manifest_file}.tmp", self.manifest_file)
+
+    def get_segment_folder(self) -> str:
+        """Get the folder of a new segment."""
+        os.makedirs(self.folder, exist_ok=True)
+        folder = f"{self.folder}/segment_{self.manifest['next_segment']:06d}"
+        if os.path.isdir(folder):  # left over of an interrupted update
+            shutil.rmtree(folder)
+        self.manifest["next_segment"] += 1
+        return folder
+
+    def update(self, feed: str, papers: list[Paper]) -> None:
+        """Replace the indexed papers of a feed with its current papers."""
+        docs = list(map(get_doc, papers))
+        keys = np.array(list(map(get_key, docs)), dtype=np.uint64)
+        indexed_keys = set()
+        for segment in self.segments:
+            live = segment.get_feed_mask(feed)
+            stale = live & ~np.isin(segment.keys, keys)
+            if stale.any():
+                segment.deleted = segment.deleted | stale
+                segment.save_deleted()
+            indexed_keys.update(segment.keys[live & ~stale].tolist())
+
+        new_docs = [doc for doc, key in zip(docs, keys.tolist()) if key not in indexed_keys]
+        if new_docs:
+            self.segments.append(Segment.write(self.get_segment_folder(), new_docs, len(new_docs) * [feed]))
+        if len(self.segments) > config.search_index_max_segments:
+            self.merge_segments()
+        else:
+            self.save_manifest()
+
+    def merge_segments(self) -> None:
+        """Merge all segments into a single segment without the deleted documents."""
+        old_segments = self.segments
+        self.segments = [Segment.merge(self.get_segment_folder(), old_segments)]
+        self.save_manifest()
+        for segment in old_segments:
+            shutil.rmtree(segment.folder)
+
+    def search(self, query: str = "", authors: list[str] = None, feeds: list[str] = None, since: int = None,
+               until: int = None, limit: int = None) -> list[tuple[str, Paper]]:
+        """Get the papers whose title or abstract contain all words of the query and whose authors include all passed
+        authors. The feeds can be restricted by prefixes of their names (e.g. CVPR) and by the years of the
+        conferences. Returns the papers together with the names of their feeds."""
+        terms = list(get_terms({"title": query, "abstract": "", "authors": authors or []}))
+        selected_feeds = [feed for feed in self.feeds
+                          if (not feeds or any(feed.startswith(prefix) for prefix in feeds))
+                          and (since is None or (get_year(feed) or 0) >= since)
+                          and (until is None or (get_year(feed) or float("inf")) <= until)]
+        required_authors = set(map(normalize_author, authors or []))
+        results = []
+        for segment in self.segments:
+            doc_ids = segment.search(terms, selected_feeds)
+            if limit is not None and not required_authors:
+                doc_ids = doc_ids[:limit - len(results)]
+            for doc_id, doc in zip(doc_ids, segment.get_docs(doc_ids)):
+                # the author tokens may match different authors, thus the full names are checked
+                if required_authors - set(map(normalize_author, doc["authors"])):
+                    continue
+                results.append((segment.feeds[segment.feed_codes[doc_id]], Paper(**doc)))
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
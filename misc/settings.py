@@ -0,0 +1,119 @@
+from __future__ import annotations
+import functools
+from dataclasses import MISSING, dataclass, fields
+import yaml
+from misc import config
+
+
+@dataclass(frozen=True)
+class Pairing:
+    """Source to target mapping of a feed."""
+    source: str
+    target: str
+    online: bool = False
+    append: bool = True
+    priority: int = 0  # papers of feeds with a higher priority are requested first
+
+
+@dataclass(frozen=True)
+class FilterSettings:
+    """Rules of misc.filters.PaperFilter."""
+    action: str = "drop"
+    title_keywords: tuple[str, ...] = ()
+    title_regex: tuple[str, ...] = ()
+    authors_allow: tuple[str, ...] = ()
+    authors_deny: tuple[str, ...] = ()
+    domains_allow: tuple[str, ...] = ()
+    domains_deny: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class RankingProfile:
+    """Keywords and seed papers of a ranking profile of misc.ranking.Ranker."""
+    keywords: tuple[str, ...] = ()
+    seeds: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Validated settings of the config file, which are loaded once and passed on to the parsers, url handlers and
+    content processors. They solely consist of immutable types, so they can be passed to worker processes as well."""
+    elsevier_api_key: str | None = None
+    springer_api_key: str | None = None
+    ieee_api_key: str | None = None
+    pairings: tuple[Pairing, ...] = ()
+    filters: FilterSettings = FilterSettings()
+    ranking_profiles: tuple[tuple[str, RankingProfile], ...] = ()
+
+    @classmethod
+    def from_file(cls, config_file: str = None) -> Settings:
+        """Load and validate the settings of the config file."""
+        config_file = config_file or config.config_file
+        with open(config_file, "r", encoding="utf-8") as file:
+            params = yaml.safe_load(file) or {}
+        if not isinstance(params, dict):
+            raise ValueError(f"The config file {config_file} does not contain a mapping.")
+        unknown = set(params) - {"elsevier_api_key", "springer_api_key", "ieee_api_key", "pairings", "filters",
+                                 "ranking"}
+        if unknown:
+            raise ValueError(f"The config file {config_file} contains the unknown settings {sorted(unknown)}.")
+
+        return cls(
+            elsevier_api_key=get_optional_str(params, "elsevier_api_key"),
+            springer_api_key=get_optional_str(params, "springer_api_key"),
+            ieee_api_key=get_optional_str(params, "ieee_api_key"),
+            pairings=tuple(create_item(Pairing, pairing, "pairings") for pairing in params.get("pairings") or []),
+            filters=create_item(FilterSettings, params.get("filters") or {}, "filters"),
+            ranking_profiles=tuple((name, create_item(RankingProfile, profile or {}, f"ranking profile {name}"))
+                                   for name, profile in ((params.get("ranking") or {}).get("profiles") or {}).items())
+        )
+
+    def get_ranking_profile(self, name: str) -> RankingProfile | None:
+        """Get a ranking profile by its name."""
+        return dict(self.ranking_profiles).get(name)
+
+
+def get_optional_str(params: dict, key: str) -> str | None:
+    value = params.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"The setting {key} has to be a string.")
+    return value or None
+
+
+def create_item(item_class: type, params: dict, name: str):
+    """Create a settings item of the parameters. Unknown parameters are rejected and lists are converted into tuples."""
+    if not isinstance(params, dict):
+        raise ValueError(f"The settings of {name} have to be a mapping.")
+    field_names = {item_field.name for item_field in fields(item_class)}
+    unknown = set(params) - field_names
+    if unknown:
+        raise ValueError(f"The settings of {name} contain the unknown keys {sorted(unknown)}.")
+    missing = [item_field.name for item_field in fields(item_class)
+               if item_field.default is MISSING and item_field.name not in params]
+    if missing:
+        raise ValueError(f"The settings of {name} miss the keys {missing}.")
+    for item_field in fields(item_class):
+        if item_field.name in params and not check_type(params[item_field.name], item_field.type):
+            type_name = "list of strings" if item_field.type == "tuple[str, ...]" else item_field.type
+            raise ValueError(f"The setting {item_field.name} of {name} has to be a {type_name}, "
+                             f"got {params[item_field.name]!r}.")
+    return item_class(**{key: tuple(value) if isinstance(value, list) else value for key, value in params.items()})
+
+
+def check_type(value, field_type: str) -> bool:
+    """Check a value of the config file against the (string) annotation of a settings field."""
+    if field_type == "str":
+        return isinstance(value, str)
+    elif field_type == "bool":
+        return isinstance(value, bool)
+    elif field_type == "int":
+        return isinstance(value, int) and not isinstance(value, bool)
+    elif field_type == "tuple[str, ...]":
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    raise ValueError(f"The settings type {field_type} is not supported.")
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings(config_file: str = None) -> Settings:
+    """Get the settings of the config file, which are solely loaded once per process."""
+    return Settings.from_file(config_file)
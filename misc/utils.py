@@ -1,12 +1,28 @@
 import bs4
-from misc import config
+from misc import archive, config
 import aiohttp
+import asyncio
 import requests
-from tqdm.asyncio import tqdm_asyncio
+from tqdm import tqdm
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+from typing import Any, AsyncIterator, Iterable
+import json
+import os
+from collections import deque
+import random
+import time
 import ssl
+import warnings
 import certifi
+from lxml import etree
+
+try:
+    import httpx
+    import h2  # noqa: F401, required by httpx for HTTP/2
+except ImportError:  # optional dependency of the http2 transport
+    httpx = None
 
 
 @dataclass
@@ -16,8 +32,245 @@ class Paper:
     abstract: str
     link: str
     domain: str = None
-    html_content: str = None
+    html_content: Any = None  # content of the publisher, which is either raw or an already parsed record
+    html_encoding: str = None  # encoding of raw contents, if declared by the publisher
     parsed: bool = False
+    retry: bool = False  # set if the paper information could not be retrieved and should be requested again
+    deferred: bool = False  # set if the paper is kept without requesting further information (see misc.filters)
+    score: float = None  # relevance score (see misc.ranking)
+    source: str = None  # page the paper information was parsed from, e.g. the paper page of a conference
+    date: str = None  # date of the source entry (e.g. the alert mail), which is used to request newer papers first
+
+
+@dataclass
+class FetchResult:
+    """Result of a single request. Failed requests carry the error message instead of the content. The content is kept
+    as raw bytes together with the encoding declared by the server, so parsers can decode it natively."""
+    url: str
+    content: bytes | None = None
+    status: int | None = None
+    error: str | None = None
+    encoding: str | None = None
+    validators: dict[str, str] | None = None  # ETag and Last-Modified headers, which allow conditional requests
+
+    @property
+    def text(self) -> str | None:
+        """Return the decoded content."""
+        if self.content is None:
+            return None
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        """Return whether the request was successful."""
+        return self.error is None
+
+
+class CircuitBreaker:
+    """Circuit breaker of a single domain. After too many consecutive failures the requests to the domain are stopped
+    for a while, instead of hammering a failing publisher. Afterwards, requests are let through again as probes."""
+    def __init__(self, threshold: int, reset_time: float) -> None:
+        self.threshold = threshold
+        self.reset_time = reset_time
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests to the domain are currently stopped."""
+        if self.opened_at is None:
+            return False
+        if time.monotonic() - self.opened_at >= self.reset_time:
+            # half open: a single further failure opens the breaker again
+            self.opened_at = None
+            self.failures = self.threshold - 1
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold and self.opened_at is None:
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class FetchStats:
+    """Counters of the requests of a single fetch call."""
+    bytes_read: int = 0  # read bytes of head only requests
+    head_only_responses: int = 0  # responses that were stopped after the html head
+    bytes_saved: int = 0  # unread bytes of stopped responses, based on their content length
+    unknown_sizes: int = 0  # stopped responses without content length, whose savings are unknown
+    requests: int = 0  # requested links, including the coalesced ones
+    coalesced: int = 0  # requests that were served by an identical request
+
+    def report(self) -> None:
+        """Print the savings of the coalesced and head only requests."""
+        if self.coalesced:
+            print(f"Coalesced {self.coalesced} of {self.requests} requests with identical requests.")
+        if self.head_only_responses:
+            unknown = f" ({self.unknown_sizes} responses without known size)" if self.unknown_sizes else ""
+            print(f"Stopped {self.head_only_responses} responses after the html head, which saved "
+                  f"{self.bytes_saved / 1e6:.1f} MB of {(self.bytes_read + self.bytes_saved) / 1e6:.1f} MB{unknown}.")
+
+    def record_head(self, content: bytes, stopped: bool, content_length: int | None) -> None:
+        """Count a head only response, whose download was stopped after the html head if stopped is set."""
+        if stopped:
+            self.head_only_responses += 1
+            if content_length is not None:
+                self.bytes_saved += max(0, content_length - len(content))
+            else:
+                self.unknown_sizes += 1
+        self.bytes_read += len(content)
+
+
+class ProxyPool:
+    """Pool of egress proxies. The requests to a host are assigned to the proxies in round-robin order or to the least
+    loaded proxy. A proxy that is rejected by a host (429 or a rejection page) is not used for this host for a while.
+    A proxy with repeated connection errors is taken out of rotation for all hosts. Without configured proxies, the
+    single proxy of the config is used."""
+    strategies = ["round_robin", "least_loaded"]
+
+    def __init__(self, proxies: list[str], strategy: str = "round_robin") -> None:
+        if strategy not in self.strategies:
+            raise ValueError(f"The proxy strategy '{strategy}' is not supported. Use one of {self.strategies}.")
+        self.proxies = list(proxies)
+        self.strategy = strategy
+        self.loads = dict.fromkeys(self.proxies, 0)  # number of running requests
+        self.failures = dict.fromkeys(self.proxies, 0)  # consecutive connection errors
+        self.unhealthy_until = dict.fromkeys(self.proxies, 0.)
+        self.banned_until = {}  # (proxy, host) to the end of the ban
+        self.next_positions = {}  # host to the round-robin position
+
+    def get_available_time(self, proxy: str, host: str) -> float:
+        """Get the time (time.monotonic) from which the proxy can be used for the host."""
+        return max(self.unhealthy_until[proxy], self.banned_until.get((proxy, host), 0.))
+
+    def acquire(self, url: str) -> str | None:
+        """Assign a proxy to a request of the url."""
+        if not self.proxies:
+            return get_proxy(url)
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        available = [proxy for proxy in self.proxies if self.get_available_time(proxy, host) <= now]
+        if not available:
+            # all proxies are out of rotation for the host, thus the one that is available first is used
+            available = [min(self.proxies, key=lambda x: self.get_available_time(x, host))]
+        if self.strategy == "least_loaded":
+            proxy = min(available, key=self.loads.get)
+        else:
+            position = self.next_positions.get(host, 0)
+            proxy = available[position % len(available)]
+            self.next_positions[host] = position + 1
+        self.loads[proxy] += 1
+        return proxy
+
+    def release(self, proxy: str | None, url: str, failed: bool = False, rejected: bool = False) -> None:
+        """Update the state of the proxy after a request, which failed with a connection error or was rejected."""
+        if proxy not in self.loads:
+            return
+        self.loads[proxy] -= 1
+        now = time.monotonic()
+        if rejected:
+            self.banned_until[(proxy, urlparse(url).netloc)] = now + config.proxy_ban_time
+        if not failed:
+            self.failures[proxy] = 0
+            return
+        self.failures[proxy] += 1
+        if self.failures[proxy] >= config.proxy_failure_threshold:
+            self.unhealthy_until[proxy] = now + config.proxy_recovery_time
+            self.failures[proxy] = 0
+
+
+class TransportError(Exception):
+    """Connection level error of a transport, e.g. a timeout or disconnect."""
+
+
+class ProxyError(TransportError):
+    """Connection error of the proxy, which does not concern the requested host."""
+
+
+class AiohttpTransport:
+    """Default transport based on aiohttp, which sends the requests over HTTP/1.1 with a pool of connections."""
+    def __init__(self, ssl_context: ssl.SSLContext | bool) -> None:
+        connector = aiohttp.TCPConnector(limit=request_limit, ssl=ssl_context)
+        self.session = aiohttp.ClientSession(trust_env=True, connector=connector)
+        self.timeout = aiohttp.ClientTimeout(sock_connect=config.request_timeout, sock_read=config.request_timeout)
+        self.concurrency = request_limit
+
+    async def get(self, url: str, header: dict | None, head_only: bool, stats: FetchStats,
+                  proxy: str = None) -> FetchResult:
+        """Request the url. Error responses are returned without content, connection errors raise a TransportError."""
+        try:
+            async with self.session.get(url, headers=header, proxy=proxy, timeout=self.timeout) as response:
+                if response.status >= 400:
+                    return FetchResult(url, status=response.status)
+                if head_only:
+                    content, stopped = await read_head(response.content.iter_chunked(chunk_size))
+                    if stopped:
+                        # close the connection instead of downloading the rest of the body
+                        response.close()
+                    stats.record_head(content, stopped, response.content_length)
+                else:
+                    content = await response.read()
+                # the declared charset is passed on as is, as charset detection requires decoding the whole body
+                return FetchResult(url, content, response.status, encoding=response.charset,
+                                   validators=get_validators(response.headers))
+        except (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError) as e:
+            raise ProxyError(f"{type(e).__name__}: {e}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransportError(f"{type(e).__name__}: {e}") from e
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+class HTTP2Transport:
+    """Transport based on httpx, which multiplexes the concurrent requests to a host over a single HTTP/2 connection
+    instead of opening many connections. Hosts without HTTP/2 support are served over HTTP/1.1."""
+    def __init__(self, ssl_context: ssl.SSLContext | bool) -> None:
+        if httpx is None:
+            raise ImportError("The http2 transport requires httpx, install it with 'pip install httpx[http2]'.")
+        self.ssl_context = ssl_context
+        self.clients = {}  # httpx sets the proxy per client, thus a client is created for each proxy
+        self.streams = asyncio.Semaphore(config.http2_max_streams)
+        self.concurrency = config.http2_max_streams
+
+    def get_client(self, proxy: str | None) -> httpx.AsyncClient:
+        if proxy not in self.clients:
+            transport = httpx.AsyncHTTPTransport(http2=True, verify=self.ssl_context, proxy=proxy)
+            self.clients[proxy] = httpx.AsyncClient(transport=transport, timeout=config.request_timeout)
+        return self.clients[proxy]
+
+    async def get(self, url: str, header: dict | None, head_only: bool, stats: FetchStats,
+                  proxy: str = None) -> FetchResult:
+        """Request the url. Error responses are returned without content, connection errors raise a TransportError."""
+        try:
+            async with self.streams, self.get_client(proxy).stream("GET", url, headers=header) as response:
+                if response.status_code >= 400:
+                    return FetchResult(url, status=response.status_code)
+                if head_only:
+                    # leaving the stream early solely resets the stream, the connection is kept for the other requests
+                    content, stopped = await read_head(response.aiter_bytes(chunk_size))
+                    content_length = response.headers.get("content-length")
+                    stats.record_head(content, stopped, int(content_length) if content_length else None)
+                else:
+                    content = await response.aread()
+                return FetchResult(url, content, response.status_code, encoding=response.charset_encoding,
+                                   validators=get_validators(response.headers))
+        except (httpx.ProxyError, httpx.ConnectError) as e:
+            # with a proxy, the connection is established to the proxy
+            error = ProxyError if proxy or isinstance(e, httpx.ProxyError) else TransportError
+            raise error(f"{type(e).__name__}: {e}") from e
+        except httpx.HTTPError as e:
+            raise TransportError(f"{type(e).__name__}: {e}") from e
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            await client.aclose()
 
 
 base_urls = {
@@ -26,7 +279,8 @@ base_urls = {
     "ICCV": "https://openaccess.thecvf.com",
     "ECCV": "https://www.ecva.net",
     "ICML": "https://proceedings.mlr.press",
-    "NIPS": "https://papers.nips.cc"
+    "NIPS": "https://papers.nips.cc",
+    "ICLR": "https://openreview.net"
 }
 
 arxiv_domain = "arxiv.org"
@@ -37,6 +291,27 @@ nature_domain = "nature.com"
 
 request_limit = 25  # number of simultaneously opened connections
 
+transient_status_codes = {408, 425, 429, 500, 502, 503, 504}
+
+validator_headers = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+head_end_tag = b"</head>"
+chunk_size = 2 ** 14
+
+transports = {
+    "aiohttp": AiohttpTransport,
+    "http2": HTTP2Transport
+}
+
+circuit_breakers = {}
+
+in_flight_requests = {}  # request key to the task of the running request (single flight)
+
+proxy_pool = ProxyPool(config.proxy_pool, config.proxy_strategy)
+page_archive = archive.PageArchive()
+offline = False  # serve all requests from the page archive instead of the network (see reextract.py)
+rejection_markers = [b"<title>request rejected</title>"]  # pages of publishers that reject the source ip
+
 
 def check_year(year: int) -> None:
     """Guarantee that years that are in the future are not allowed."""
@@ -49,38 +324,406 @@ def get_link(item: bs4.element.Tag) -> str:
     return item.find("a")["href"]
 
 
-async def fetch_url(session: aiohttp.client.ClientSession, url: str, header: str | None) -> str:
-    """Fetch URL using an aiohttp Session to allow asynchronous execution."""
-    async with session.get(url, headers=header, proxy=config.proxies) as response:
-        return await response.text()
+def get_core_domain(url: str) -> str:
+    """Get the core domain of an url, e.g. arxiv.org for https://export.arxiv.org/abs/1234."""
+    domain = urlparse(url).netloc
+    return ".".join(domain.split(".")[-2:])
+
+
+def get_proxy(url: str) -> str | None:
+    """Get the configured proxy for the scheme of the url."""
+    return config.proxies.get(urlparse(url).scheme)
+
+
+def get_transport_name(url: str) -> str:
+    """Get the name of the transport, which is configured for the domain or core domain of the url."""
+    name = config.domain_transports.get(urlparse(url).netloc,
+                                        config.domain_transports.get(get_core_domain(url), config.default_transport))
+    if name not in transports:
+        raise ValueError(f"The transport '{name}' is not supported. Use one of {list(transports)}.")
+    if name == "http2" and httpx is None:
+        warnings.warn("The http2 transport requires 'pip install httpx[http2]', aiohttp is used instead.")
+        return "aiohttp"
+    return name
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Get the circuit breaker of the domain of the url."""
+    domain = urlparse(url).netloc
+    if domain not in circuit_breakers:
+        circuit_breakers[domain] = CircuitBreaker(config.circuit_breaker_threshold, config.circuit_breaker_reset)
+    return circuit_breakers[domain]
+
 
+def is_rejected(result: FetchResult) -> bool:
+    """Check whether the publisher rejected the request due to the source ip (e.g. IEEE)."""
+    if result.status == 429:
+        return True
+    head = (result.content or b"")[:4096].lower()
+    return any(marker in head for marker in rejection_markers)
 
-async def get_paper_html_content(links: list[str], headers: list[dict] = None) -> list[str]:
-    """Get the html content of all links."""
+
+def get_backoff(attempt: int) -> float:
+    """Get the delay before the next retry based on exponential backoff with full jitter."""
+    return random.uniform(0, min(config.max_retry_backoff, config.retry_backoff * 2 ** attempt))
+
+
+async def read_head(chunks: AsyncIterator[bytes]) -> tuple[bytes, bool]:
+    """Stream the response body until the end of the html head. Returns the read content and whether the head end was
+    found, in which case the rest of the body is not downloaded."""
+    content = bytearray()
+    async for chunk in chunks:
+        start = max(0, len(content) - len(head_end_tag) + 1)
+        content += chunk
+        idx = bytes(content[start:]).lower().find(head_end_tag)
+        if idx != -1:
+            return bytes(content[:start + idx + len(head_end_tag)]), True
+    return bytes(content), False
+
+
+async def fetch_url(transport: AiohttpTransport | HTTP2Transport, url: str, header: dict | None,
+                    head_only: bool = False, stats: FetchStats = None) -> FetchResult:
+    """Fetch URL using a transport to allow asynchronous execution. Transient errors are retried with backoff, all
+    other errors are returned as failed result instead of being raised. If only the html head is required, the download
+    is stopped as soon as the head is complete."""
+    breaker = get_circuit_breaker(url)
+    stats = stats if stats is not None else FetchStats()
+    status = None
+    error = None
+    for attempt in range(config.max_retries + 1):
+        if breaker.is_open:
+            return FetchResult(url, status=status, error=f"Circuit breaker for {urlparse(url).netloc} is open.")
+        proxy = proxy_pool.acquire(url)
+        result = None
+        proxy_failed = rejected = False
+        try:
+            result = await transport.get(url, header, head_only, stats, proxy)
+            rejected = is_rejected(result)
+        except ProxyError as e:
+            proxy_failed = True
+            error = f"Request failed with {e}"
+        except TransportError as e:
+            error = f"Request failed with {e}"
+        finally:
+            proxy_pool.release(proxy, url, proxy_failed, rejected)
+
+        # failures of single proxies of the pool are not counted for the circuit breaker of the host
+        host_failed = not proxy_failed
+        if rejected and proxy_pool.proxies:
+            # the rejected proxy is banned for the host, thus another proxy is used in the next attempt
+            status = result.status
+            error = f"Request was rejected by {urlparse(url).netloc}."
+            host_failed = False
+        elif result is not None:
+            status = result.status
+            if status < 400:
+                breaker.record_success()
+                return result
+            error = f"Request failed with status {status}."
+            if status not in transient_status_codes:
+                return FetchResult(url, status=status, error=error)
+
+        if host_failed:
+            breaker.record_failure()
+        if attempt < config.max_retries:
+            await asyncio.sleep(get_backoff(attempt))
+
+    return FetchResult(url, status=status, error=error)
+
+
+def get_canonical_url(url: str) -> str:
+    """Normalize the parts of an url that do not change the requested resource (case of the scheme and host, default
+    ports and fragments)."""
+    parts = urlparse(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rpartition(":")[2]) in [("http", "80"), ("https", "443")]:
+        netloc = netloc.rpartition(":")[0]
+    return urlunparse((scheme, netloc, parts.path or "/", parts.params, parts.query, ""))
+
+
+def get_archive_url(url: str) -> str:
+    """Get the canonical url without credentials (e.g. api keys of the publishers), which is stored in the archive."""
+    canonical_url = get_canonical_url(url)
+    parts = urlparse(canonical_url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    query = [(key, value) for key, value in params if key.lower() not in config.credential_params]
+    if len(query) == len(params):  # urls without credentials are kept unchanged
+        return canonical_url
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def get_request_key(url: str, header: dict | None, head_only: bool) -> tuple:
+    """Get the key of a request, which is identical for requests that can be served by the same response."""
+    header = frozenset((key.lower(), value) for key, value in (header or {}).items())
+    return get_canonical_url(url), header, head_only
+
+
+async def fetch_url_once(transport: AiohttpTransport | HTTP2Transport, url: str, header: dict | None,
+                         head_only: bool = False, stats: FetchStats = None) -> FetchResult:
+    """Fetch URL, unless an identical request is already in flight. Then its response is shared instead of sending the
+    request again (single flight), e.g. for concurrent fetch calls requesting the same papers."""
+    stats = stats if stats is not None else FetchStats()
+    key = get_request_key(url, header, head_only)
+    while True:
+        task = in_flight_requests.get(key)
+        owner = task is None or task.get_loop() is not asyncio.get_running_loop()
+        if owner:
+            task = asyncio.ensure_future(fetch_url(transport, url, header, head_only, stats))
+            in_flight_requests[key] = task
+            task.add_done_callback(lambda done_task: in_flight_requests.pop(key, None)
+                                   if in_flight_requests.get(key) is done_task else None)
+        else:
+            stats.coalesced += 1
+        try:
+            # the shared request is not cancelled, if a single waiting caller is cancelled
+            result = await asyncio.shield(task)
+            return replace(result, url=url)
+        except asyncio.CancelledError:
+            if owner:
+                # requests of cancelled owners (e.g. at the deadline of a time budget) are not continued
+                task.cancel()
+                raise
+            if not task.cancelled():
+                raise
+            stats.coalesced -= 1  # the owner of the shared request was cancelled, thus it is requested again
+
+
+async def get_paper_html_content(links: list[str], headers: list[dict] = None, head_only: list[bool] = None,
+                                 priorities: list[int] = None, deadline: float = None) -> list[FetchResult]:
+    """Get the html content of all links. Failing requests do not affect the others, so the results are partial."""
     print("Retrieving paper data.")
+    return await fetch_urls(links, headers, head_only, priorities, deadline)
+
 
+async def fetch_urls(links: list[str], headers: list[dict] = None, head_only: list[bool] = None,
+                     priorities: list[int] = None, deadline: float = None) -> list[FetchResult]:
+    """Fetch all links concurrently with the transports configured for their domains. For links flagged as head only,
+    solely the html head is downloaded. Identical requests are sent once.
+
+    The requests are started in the order of their priorities (lowest value first). If a deadline (time.monotonic) is
+    set, no requests are started afterwards and running ones are cancelled. Their links are returned as failed."""
     if not headers:
         headers = len(links) * [None]
+    if not head_only:
+        head_only = len(links) * [False]
+    if not priorities:
+        priorities = len(links) * [0]
+    if offline:
+        return get_archived_results(links)
 
-    # usually this works, but in case the requests fail, check https://stackoverflow.com/questions/51248714/aiohttp-client-exception-serverdisconnectederror-is-this-the-api-servers-issu
     if config.verify_ssl:
         ssl_context = ssl.create_default_context(cafile=certifi.where())
     else:
-        ssl_context = None
-    connector = aiohttp.TCPConnector(limit=request_limit, ssl=ssl_context, verify_ssl=config.verify_ssl)
-    async with aiohttp.ClientSession(trust_env=True, connector=connector) as session:
-        tasks = [fetch_url(session, url, header) for url, header in zip(links, headers)]
-        html_contents = await tqdm_asyncio.gather(*tasks)
-        return html_contents
+        ssl_context = False
+    stats = FetchStats(requests=len(links))
+    # identical requests of the links are grouped, so they are served by a single request
+    requests = {}
+    for idx in sorted(range(len(links)), key=lambda x: priorities[x]):
+        requests.setdefault(get_request_key(links[idx], headers[idx], head_only[idx]), []).append(idx)
+    stats.coalesced = len(links) - len(requests)
+    pending_requests = deque(requests.values())
+    results = len(links) * [None]
+    progress = tqdm(total=len(links))
+
+    async def work() -> None:
+        """Send the pending requests one after another in the order of their priorities."""
+        while pending_requests and (deadline is None or time.monotonic() < deadline):
+            indices = pending_requests.popleft()
+            url = links[indices[0]]
+            result = await fetch_url_once(link_transports[get_transport_name(url)], url, headers[indices[0]],
+                                          head_only[indices[0]], stats)
+            for idx in indices:
+                results[idx] = replace(result, url=links[idx])
+            progress.update(len(indices))
+
+    # a transport of each required kind is shared by all links, which are assigned to it
+    link_transports = {}
+    try:
+        for url in links:
+            name = get_transport_name(url)
+            if name not in link_transports:
+                link_transports[name] = transports[name](ssl_context)
+        # as many workers as the transports can serve simultaneously
+        n_workers = min(sum(transport.concurrency for transport in link_transports.values()), len(requests))
+        workers = [asyncio.ensure_future(work()) for _ in range(n_workers)]
+        if workers:
+            timeout = None if deadline is None else max(0., deadline - time.monotonic())
+            done, not_done = await asyncio.wait(workers, timeout=timeout)
+            for worker in not_done:
+                worker.cancel()
+            await asyncio.gather(*not_done, return_exceptions=True)
+            for worker in done:
+                worker.result()  # raise unexpected errors
+    finally:
+        progress.close()
+        for transport in link_transports.values():
+            await transport.close()
+
+    n_skipped = results.count(None)
+    if n_skipped:
+        print(f"{n_skipped} of {len(results)} requests were not finished within the time budget.")
+    results = [result or FetchResult(link, error="The request was not finished within the time budget.")
+               for result, link in zip(results, links)]
+    n_failed = len([result for result in results if not result.ok])
+    if n_failed:
+        print(f"{n_failed} of {len(results)} requests failed.")
+    stats.report()
+    archive_results([results[indices[0]] for indices in requests.values()])
+    return results
+
+
+def fetch_url_sync(url: str, headers: dict = None) -> FetchResult:
+    """Fetch URL with requests. Uses the same retry and circuit breaker logic as the asynchronous fetching."""
+    if offline:
+        return get_archived_results([url])[0]
+    breaker = get_circuit_breaker(url)
+    status = None
+    error = None
+    for attempt in range(config.max_retries + 1):
+        if breaker.is_open:
+            return FetchResult(url, status=status, error=f"Circuit breaker for {urlparse(url).netloc} is open.")
+        proxy = proxy_pool.acquire(url)
+        result = None
+        proxy_failed = rejected = False
+        try:
+            response = requests.get(url, headers=headers, proxies={"http": proxy, "https": proxy},
+                                    verify=config.verify_ssl, timeout=config.request_timeout)
+            encoding = get_declared_encoding(response.headers.get("Content-Type"))
+            result = FetchResult(url, response.content, response.status_code, encoding=encoding,
+                                 validators=get_validators(response.headers))
+            rejected = is_rejected(result)
+        except requests.exceptions.ProxyError as e:
+            proxy_failed = True
+            error = f"Request failed with {type(e).__name__}: {e}"
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = f"Request failed with {type(e).__name__}: {e}"
+        except (requests.exceptions.InvalidSchema, requests.exceptions.MissingSchema,
+                requests.exceptions.InvalidURL):
+            return FetchResult(url, error=f"{url} is no valid URL.")
+        finally:
+            proxy_pool.release(proxy, url, proxy_failed, rejected)
+
+        host_failed = not proxy_failed
+        if rejected and proxy_pool.proxies:
+            status = result.status
+            error = f"Request was rejected by {urlparse(url).netloc}."
+            host_failed = False
+        elif result is not None:
+            status = result.status
+            if status < 400:
+                breaker.record_success()
+                archive_results([result])
+                return result
+            error = f"Request failed with status {status}."
+            if status not in transient_status_codes:
+                return FetchResult(url, status=status, error=error)
+
+        if host_failed:
+            breaker.record_failure()
+        if attempt < config.max_retries:
+            time.sleep(get_backoff(attempt))
+
+    return FetchResult(url, status=status, error=error)
+
+
+def archive_results(results: list[FetchResult]) -> None:
+    """Store the pages of the successful requests in the page archive."""
+    if config.archive_pages:
+        page_archive.add([(get_archive_url(result.url), result.content, result.status, result.encoding)
+                          for result in results if result.status == 200 and result.content is not None])
+
+
+def get_archived_results(links: list[str]) -> list[FetchResult]:
+    """Get the results of the links from the page archive."""
+    pages = page_archive.get_pages(list(map(get_archive_url, links)))
+    return [FetchResult(link, page[0], page[1], encoding=page[2]) if page is not None
+            else FetchResult(link, error="The page is not part of the archive.") for link, page in zip(links, pages)]
+
+
+def get_declared_encoding(content_type: str | None) -> str | None:
+    """Get the charset that is declared in the content type header, without inspecting the content."""
+    if content_type:
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "charset":
+                return value.strip().strip("'\"") or None
+    return None
+
+
+def get_validators(headers) -> dict[str, str]:
+    """Get the headers of a response, which validate the cached content in conditional requests."""
+    return {key: headers[key] for key in validator_headers if headers.get(key)}
+
+
+def get_conditional_header(validators: dict[str, str] | None) -> dict[str, str]:
+    """Get the request header, which asks the server to respond with 304 if the content was not modified."""
+    validators = validators or {}
+    return {condition: validators[key] for key, condition in validator_headers.items() if key in validators}
+
+
+def get_url_content(url: str) -> FetchResult:
+    """Get the content of an url, which is required to continue (e.g. conference index pages)."""
+    result = fetch_url_sync(url)
+    if not result.ok:
+        raise ValueError(f"Could not retrieve {url}. {result.error}")
+    return result
 
 
 def get_soup(url: str) -> bs4.BeautifulSoup:
     """Compact class to retrieve url and pass it into bs4."""
-    content = requests.get(url, proxies=config.proxies, verify=config.verify_ssl).content.decode("utf-8")
-    soup = bs4.BeautifulSoup(content, parser="html.parser", features="lxml")
+    result = get_url_content(url)
+    soup = bs4.BeautifulSoup(result.content, features="lxml", from_encoding=result.encoding)
     return soup
 
 
+def load_retry_queue() -> set[str]:
+    """Load the links of the papers whose information could not be retrieved in previous runs."""
+    if not os.path.isfile(config.retry_queue_file):
+        return set()
+    with open(config.retry_queue_file, "r", encoding="utf-8") as file:
+        return set(json.load(file))
+
+
+def update_retry_queue(processed_links: Iterable[str], failed_links: Iterable[str]) -> None:
+    """Update the retry queue with the results of the current run. Links that were processed are removed unless they
+    failed again, while links of papers that were not part of the run are kept."""
+    queue = (load_retry_queue() - set(processed_links)) | set(failed_links)
+    with open(config.retry_queue_file, "w", encoding="utf-8") as file:
+        json.dump(sorted(queue), file, indent=1)
+
+
+def load_validators() -> dict[str, dict[str, str]]:
+    """Load the validators of the pages that were retrieved in previous runs."""
+    if not os.path.isfile(config.validators_file):
+        return {}
+    with open(config.validators_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def update_validators(validators: dict[str, dict[str, str]]) -> None:
+    """Store the validators of the retrieved pages, so they can be requested conditionally in the next runs."""
+    if not validators:
+        return
+    all_validators = load_validators()
+    all_validators.update(validators)
+    with open(config.validators_file, "w", encoding="utf-8") as file:
+        json.dump(all_validators, file, indent=1)
+
+
+def load_atom_feed(file_path: str) -> list[Paper]:
+    """Load the papers of an atom feed created by misc.generator. Returns an empty list if the feed does not exist."""
+    if not os.path.isfile(file_path):
+        return []
+    papers = []
+    for entry in etree.parse(file_path, etree.XMLParser(recover=True, huge_tree=True)).getroot().iterfind("{*}entry"):
+        source = entry.find("{*}link[@rel='via']")
+        papers.append(Paper(entry.findtext("{*}title", ""), entry.xpath("*[local-name()='author']/*/text()"),
+                            entry.findtext("{*}summary", "").strip(), entry.findtext("{*}id", ""),
+                            source=source.get("href") if source is not None else None))
+    return papers
+
+
 def decode_xml_soup(soup: bs4.BeautifulSoup) -> tuple[list[str], list[list[str]], list[str], list[str]]:
     titles = list(map(lambda x: x.text, soup.select("entry >title")))
     all_authors = list(map(lambda x: list(map(lambda y: y.text, x.select("author"))), soup.select("entry")))
@@ -0,0 +1,162 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import asdict
+from misc import config
+from misc.utils import Paper
+
+# fields of the papers that are stored in the queue, the remaining fields are solely used during a run
+paper_fields = ["title", "authors", "abstract", "link", "domain", "retry", "deferred", "source"]
+
+
+def get_worker_id() -> str:
+    """Get an id of the current process, which is unique across the machines sharing the queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def dump_papers(papers: list[Paper]) -> str:
+    return json.dumps([{field: value for field, value in asdict(paper).items() if field in paper_fields}
+                       for paper in papers])
+
+
+def load_papers(content: str) -> list[Paper]:
+    return [Paper(**paper) for paper in json.loads(content)]
+
+
+class WorkQueue:
+    """Lease based work queue stored in a SQLite file. A job (e.g. CVPR 2023) is split into shards of paper links, which
+    are drained by workers in different processes or on different machines sharing the file. A leased shard is reserved
+    for its worker as long as the worker renews the lease with heartbeats. Shards of crashed workers are leased again
+    after their lease expired, until they fail too often. The finished shards are merged in their original order, then
+    solely a marker of the merged job is kept, so late workers do not start the job again."""
+    def __init__(self, queue_file: str = None) -> None:
+        self.queue_file = queue_file or config.work_queue_file
+        with closing(self.connect()) as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS shards (job TEXT, shard INTEGER, links TEXT, papers TEXT, "
+                               "status TEXT, worker TEXT, lease_until REAL, attempts INTEGER, "
+                               "PRIMARY KEY (job, shard))")
+
+    def connect(self) -> sqlite3.Connection:
+        # transactions are handled explicitly, so leasing a shard is atomic across processes
+        return sqlite3.connect(self.queue_file, timeout=60, isolation_level=None)
+
+    def has_job(self, job: str) -> bool:
+        with closing(self.connect()) as connection:
+            return connection.execute("SELECT 1 FROM shards WHERE job = ? LIMIT 1", (job,)).fetchone() is not None
+
+    def is_merged(self, job: str) -> bool:
+        with closing(self.connect()) as connection:
+            return connection.execute("SELECT 1 FROM shards WHERE job = ? AND status = 'merged'",
+                                      (job,)).fetchone() is not None
+
+    def reset_job(self, job: str) -> None:
+        """Remove a job including its merged marker, so it can be added again (e.g. for a new crawl)."""
+        with closing(self.connect()) as connection:
+            connection.execute("DELETE FROM shards WHERE job = ?", (job,))
+
+    def add_job(self, job: str, shards: list[list[str]], papers: list[Paper] = None) -> bool:
+        """Add the shards of a job. Papers that are already known (e.g. deferred ones) are stored as finished shard 0.
+        Returns False if the job was already added by another worker."""
+        rows = [(job, 0, "[]", dump_papers(papers or []), "done")]
+        rows += [(job, idx + 1, json.dumps(links), None, "pending") for idx, links in enumerate(shards)]
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("SELECT 1 FROM shards WHERE job = ? LIMIT 1", (job,)).fetchone() is not None:
+                connection.execute("ROLLBACK")
+                return False
+            connection.executemany("INSERT INTO shards VALUES (?, ?, ?, ?, ?, NULL, NULL, 0)", rows)
+            connection.execute("COMMIT")
+        return True
+
+    def lease(self, job: str, worker: str) -> tuple[int, list[str]] | None:
+        """Lease the next pending shard or a shard with an expired lease. Returns None if there is nothing to do."""
+        now = time.time()
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            # shards with an expired lease, which reached the maximal number of attempts, are given up
+            connection.execute("UPDATE shards SET status = 'failed', worker = NULL WHERE job = ? AND status = 'leased' "
+                               "AND lease_until < ? AND attempts >= ?", (job, now, config.max_shard_attempts))
+            row = connection.execute("SELECT shard, links FROM shards WHERE job = ? AND (status = 'pending' OR "
+                                     "(status = 'leased' AND lease_until < ?)) ORDER BY shard LIMIT 1",
+                                     (job, now)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE shards SET status = 'leased', worker = ?, lease_until = ?, "
+                                   "attempts = attempts + 1 WHERE job = ? AND shard = ?",
+                                   (worker, now + config.lease_duration, job, row[0]))
+            connection.execute("COMMIT")
+        return (row[0], json.loads(row[1])) if row is not None else None
+
+    def heartbeat(self, job: str, shard: int, worker: str) -> bool:
+        """Renew the lease of a shard. Returns False if the worker lost the lease."""
+        with closing(self.connect()) as connection:
+            cursor = connection.execute("UPDATE shards SET lease_until = ? WHERE job = ? AND shard = ? AND worker = ? "
+                                        "AND status = 'leased'",
+                                        (time.time() + config.lease_duration, job, shard, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job: str, shard: int, worker: str, papers: list[Paper]) -> bool:
+        """Store the papers of a shard. Returns False if the worker lost the lease, then the result is discarded."""
+        with closing(self.connect()) as connection:
+            cursor = connection.execute("UPDATE shards SET status = 'done', papers = ?, worker = NULL WHERE job = ? "
+                                        "AND shard = ? AND worker = ? AND status = 'leased'",
+                                        (dump_papers(papers), job, shard, worker))
+            return cursor.rowcount == 1
+
+    def release(self, job: str, shard: int, worker: str) -> None:
+        """Hand a shard back after an error, so it is leased again or marked as failed after too many attempts."""
+        with closing(self.connect()) as connection:
+            connection.execute("UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                               "worker = NULL WHERE job = ? AND shard = ? AND worker = ? AND status = 'leased'",
+                               (config.max_shard_attempts, job, shard, worker))
+
+    def get_status(self, job: str) -> dict[str, int]:
+        """Count the shards of a job per status."""
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM shards WHERE job = ? AND shard > 0 "
+                                      "GROUP BY status", (job,)).fetchall()
+        return dict(rows)
+
+    def pop_papers(self, job: str) -> list[Paper] | None:
+        """Merge the papers of all finished shards of a job in the order of the shards and mark the job as merged, so
+        solely a single worker merges it. Returns None if there are unfinished shards or if the job was merged
+        already."""
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            statuses = {status for (status,) in connection.execute("SELECT status FROM shards WHERE job = ?", (job,))}
+            if not statuses or statuses & {"pending", "leased", "merged"}:
+                connection.execute("ROLLBACK")
+                return None
+            rows = connection.execute("SELECT papers FROM shards WHERE job = ? AND status = 'done' ORDER BY shard",
+                                      (job,)).fetchall()
+            # the shards are dropped, shard 0 is kept without papers as marker of the merged job
+            connection.execute("DELETE FROM shards WHERE job = ? AND shard > 0", (job,))
+            connection.execute("UPDATE shards SET status = 'merged', papers = NULL, links = '[]' WHERE job = ? "
+                               "AND shard = 0", (job,))
+            connection.execute("COMMIT")
+        return [paper for (content,) in rows for paper in load_papers(content)]
+
+
+class Heartbeat(threading.Thread):
+    """Background thread, which renews the lease of a shard while the worker is processing it."""
+    def __init__(self, work_queue: WorkQueue, job: str, shard: int, worker: str) -> None:
+        super().__init__(daemon=True)
+        self.work_queue = work_queue
+        self.job = job
+        self.shard = shard
+        self.worker = worker
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(config.heartbeat_interval):
+            if not self.work_queue.heartbeat(self.job, self.shard, self.worker):
+                print(f"The lease of shard {self.shard} of {self.job} was lost.")
+                return
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
@@ -1,33 +1,160 @@
 import argparse
-from misc import generator
-from parsers.conferences import icml, cvf, nips, ecva
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from misc import config, generator, profiling, ranking, utils, work_queue
+from misc.settings import Settings, get_settings
+from misc.utils import Paper
+from parsers.conferences import base, icml, cvf, nips, ecva, openreview
 
 
-def main(args: argparse.Namespace) -> None:
-    """Main method to execute conference feeding."""
-    conference = args.conference
-    year = args.year
-
+def get_parser(conference: str, year: int, settings: Settings) -> base.Parser:
+    """Get the parser of the conference."""
     if conference in ["CVPR", "WACV", "ICCV"]:
-        paper_parser = cvf.CVFParser(conference, year)
+        return cvf.CVFParser(conference, year, settings)
     elif conference == "ECCV":
-        paper_parser = ecva.ECVAParser(conference, year)
+        return ecva.ECVAParser(conference, year, settings)
     elif conference == "ICML":
-        paper_parser = icml.ICMLParser(conference, year)
+        return icml.ICMLParser(conference, year, settings)
     elif conference == "NIPS":
-        paper_parser = nips.NIPSParser(conference, year)
+        return nips.NIPSParser(conference, year, settings)
+    elif conference in openreview.venue_ids:
+        return openreview.OpenReviewParser(conference, year, settings)
     else:
         raise ValueError(f"Conference '{conference}' is not or not yet supported.")
 
-    papers = paper_parser.get_papers()
+
+def run_worker(queue_file: str, conference: str, year: int, settings: Settings) -> int:
+    """Process the shards of a conference from the work queue until none is left. Returns the number of processed
+    shards. The settings of the main process are passed, so the workers do not load the config file again."""
+    paper_parser = get_parser(conference, year, settings)
+    queue = work_queue.WorkQueue(queue_file)
+    job = f"{conference}{year}"
+    worker = work_queue.get_worker_id()
+    n_shards = 0
+    while True:
+        lease = queue.lease(job, worker)
+        if lease is None:
+            return n_shards
+        shard, paper_parser.links = lease
+        paper_parser.papers = []
+        heartbeat = work_queue.Heartbeat(queue, job, shard, worker)
+        heartbeat.start()
+        try:
+            paper_parser.parse_papers()
+        except Exception as error:
+            heartbeat.stop()
+            print(f"Shard {shard} of {job} failed and is handed back to the queue. {error}")
+            queue.release(job, shard, worker)
+            continue
+        heartbeat.stop()
+        if queue.complete(job, shard, worker, paper_parser.papers):
+            n_shards += 1
+
+
+def get_papers_sharded(args: argparse.Namespace, year: int, paper_parser: base.Parser, known_papers: list[Paper],
+                       settings: Settings) -> list[Paper] | None:
+    """Get the papers via the work queue. The paper links are split into shards, which are processed by local workers
+    and by the workers of other machines sharing the queue file. Returns None if other workers are still busy (then the
+    last worker merges the shards) or if the job was merged already."""
+    queue = work_queue.WorkQueue(args.queue_file)
+    job = f"{args.conference}{year}"
+    if args.reset_queue:
+        queue.reset_job(job)
+    if queue.is_merged(job):
+        print(f"{job} was already merged into the feed. Pass --reset_queue True to crawl it again.")
+        return None
+    if not queue.has_job(job):
+        with profiling.stage("index"):
+            links = paper_parser.get_paper_links(paper_parser.get_url_container(), known_papers)
+        shards = [shard.tolist() for shard in np.array_split(links, max(min(args.shards, len(links)), 1))]
+        if queue.add_job(job, shards, paper_parser.papers):
+            print(f"Added {len(links)} papers of {job} in {len(shards)} shards to the work queue.")
+
+    if args.workers > 0:
+        print(f"Processing the shards of {job} with {args.workers} workers.")
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(run_worker, args.queue_file, args.conference, year, settings)
+                       for _ in range(args.workers)]
+            n_shards = sum(future.result() for future in futures)
+        print(f"Processed {n_shards} shards.")
+
+    status = queue.get_status(job)
+    papers = queue.pop_papers(job)
+    if papers is None:
+        print(f"The shards of {job} are not finished yet ({status}). The last worker merges them.")
+    elif status.get("failed"):
+        print(f"{status['failed']} shards of {job} failed too often, their papers are missing.")
+    return papers
+
+
+def parse_year(args: argparse.Namespace, year: int, settings: Settings) -> None:
+    """Generate the feed of the conference in a year."""
+    conference = args.conference
+    paper_parser = get_parser(conference, year, settings)
+
+    # in incremental mode, solely papers that are not part of the existing feed are retrieved and appended
+    known_papers = []
+    if args.incremental:
+        with profiling.stage("load"):
+            known_papers = utils.load_atom_feed(f"{config.result_feed_folder}/{conference}_{year}.xml")
+        print(f"Loaded {len(known_papers)} papers of the existing feed.")
+
+    if args.shards:
+        papers = get_papers_sharded(args, year, paper_parser, known_papers, settings)
+        if papers is None:
+            return
+    else:
+        papers = paper_parser.get_papers(known_papers)
+
+    if args.recheck and known_papers:
+        known_papers = paper_parser.recheck_papers(known_papers)
+    papers = known_papers + papers
+    utils.update_validators(paper_parser.validators)
+    if args.profile:
+        print("Ranking papers.")
+        with profiling.stage("rank"):
+            papers = ranking.Ranker.from_settings(settings, args.profile).rank(papers, args.top_k)
     print("Generate and save atom feeds.")
-    generator.create_atom_feed(papers, conference=conference, year=year)
+    with profiling.stage("save"):
+        generator.create_atom_feed(papers, conference=conference, year=year)
+
+
+def main(args: argparse.Namespace) -> None:
+    """Main method to execute conference feeding. Index pages that list multiple years (e.g. of the ECCV) are solely
+    requested once for all years."""
+    settings = get_settings()
+    for year in args.year:
+        print(f"Parsing {args.conference} {year}.")
+        parse_year(args, year, settings)
 
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser()
     arg_parser.add_argument("--conference", "-c",
-                            help="Supported conferences are: 'CVPR', 'WACV', 'ICCV', 'ECCV' and 'ICML'.")
-    arg_parser.add_argument("--year", "-y", type=int, help="Year of the conference.")
+                            help="Supported conferences are: 'CVPR', 'WACV', 'ICCV', 'ECCV', 'ICML', 'NIPS' and "
+                                 "'ICLR'.")
+    arg_parser.add_argument("--year", "-y", type=int, nargs="+", help="Year/s of the conference.")
+    arg_parser.add_argument("--profile", "-p", nargs="+",
+                            help="Ranking profile/s of the config file to score the papers by relevance.")
+    arg_parser.add_argument("--top_k", "-k", type=int,
+                            help="Keep solely the k most relevant papers (requires a ranking profile).")
+    arg_parser.add_argument("--incremental", "-i", type=bool, default=False,
+                            help="Retrieve solely the papers that are not part of the existing feed and append them.")
+    arg_parser.add_argument("--recheck", type=bool, default=False,
+                            help="Request the known papers of the incremental mode again and update the changed ones.")
+    arg_parser.add_argument("--shards", type=int,
+                            help="Split the papers into shards, which are processed via a work queue.")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="Number of local worker processes for the shards, 0 solely adds the shards.")
+    arg_parser.add_argument("--queue_file", default=config.work_queue_file,
+                            help="SQLite file of the work queue, which can be shared by multiple machines.")
+    arg_parser.add_argument("--reset_queue", type=bool, default=False,
+                            help="Remove the shards of the conference from the work queue, also after they were merged.")
+    arg_parser.add_argument("--profiling", choices=profiling.modes,
+                            help="Profile the cpu time or memory of each stage, the results are stored in profiles/.")
     input_args = arg_parser.parse_args()
-    main(input_args)
+    profiling.start(input_args.profiling, "parse_conference")
+    try:
+        main(input_args)
+    finally:
+        profiling.stop()
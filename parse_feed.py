@@ -1,21 +1,25 @@
 import argparse
-from misc import config
-import yaml
+import time
+from misc import profiling, ranking
+from misc.settings import get_settings
 from parsers.feeds import feed
 
 
 def main(args: argparse.Namespace) -> None:
     """Main method to coordinate parse feeding execution."""
+    deadline = time.monotonic() + args.time_budget if args.time_budget else None
     use_config = args.use_config
     remove_duplicates = args.remove_duplicates
+    settings = get_settings()
 
     if use_config:
-        configs = yaml.safe_load(open(config.config_file)).get("pairings")
+        configs = settings.pairings
         if configs:
-            sources = list(map(lambda x: x.get("source"), configs))
-            targets = list(map(lambda x: x.get("target"), configs))
-            onlines = list(map(lambda x: x.get("online"), configs))
-            appendings = list(map(lambda x: x.get("append"), configs))
+            sources = list(map(lambda x: x.source, configs))
+            targets = list(map(lambda x: x.target, configs))
+            onlines = list(map(lambda x: x.online, configs))
+            appendings = list(map(lambda x: x.append, configs))
+            priorities = list(map(lambda x: x.priority, configs))
         else:
             raise Warning("No pairings found in the config file.")
     else:
@@ -23,13 +27,24 @@ def main(args: argparse.Namespace) -> None:
         targets = list(args.target)
         onlines = list(args.online)
         appendings = list(args.append)
+        priorities = None
 
-    feed_list = feed.FeedList(sources, targets, onlines, appendings)
-    feed_list.build_feeds()
+    with profiling.stage("sources"):
+        feed_list = feed.FeedList(sources, targets, onlines, appendings, priorities, deadline, settings)
+    with profiling.stage("build"):
+        feed_list.build_feeds()
     if remove_duplicates:
-        feed_list.remove_duplicates()
+        with profiling.stage("duplicates"):
+            feed_list.remove_duplicates()
     feed_list.refine_feeds()
-    feed_list.save_feeds()
+    if args.remove_near_duplicates:
+        with profiling.stage("near_duplicates"):
+            feed_list.remove_near_duplicates()
+    if args.profile:
+        with profiling.stage("rank"):
+            feed_list.rank_feeds(ranking.Ranker.from_settings(settings, args.profile), args.top_k)
+    with profiling.stage("save"):
+        feed_list.save_feeds()
     feed_list.print_update_stats()
 
 
@@ -45,5 +60,21 @@ if __name__ == "__main__":
                             help="Append new entries to current feed file")
     arg_parser.add_argument("--remove_duplicates", "-r", type=bool, default=True,
                             help="Remove duplicates across feed list.")
+    arg_parser.add_argument("--remove_near_duplicates", "-n", type=bool, default=False,
+                            help="Remove near duplicates (e.g. arxiv and publisher version) across feed list and "
+                                 "previous runs.")
+    arg_parser.add_argument("--profile", "-p", nargs="+",
+                            help="Ranking profile/s of the config file to score the papers by relevance.")
+    arg_parser.add_argument("--top_k", "-k", type=int,
+                            help="Keep solely the k most relevant new papers of each feed (requires a profile).")
+    arg_parser.add_argument("--time_budget", "-b", type=float,
+                            help="Seconds after which no further paper information is requested. The remaining papers "
+                                 "are saved without it and requested in the next run.")
+    arg_parser.add_argument("--profiling", choices=profiling.modes,
+                            help="Profile the cpu time or memory of each stage, the results are stored in profiles/.")
     input_args = arg_parser.parse_args()
-    main(input_args)
+    profiling.start(input_args.profiling, "parse_feed")
+    try:
+        main(input_args)
+    finally:
+        profiling.stop()
@@ -1,21 +1,146 @@
-from misc import utils
+from misc import utils, filters, profiling
+from misc.dedup import normalize_title
+from misc.settings import Settings, get_settings
+from misc.utils import Paper
+from urllib.parse import urljoin
+import abc
+import asyncio
+import bs4
 
 
-class Parser:
+def get_title_info(container: bs4.element.Tag) -> tuple[str, list[str]]:
+    """Get the title of a paper from its title container (dt) and the authors from the dd element that directly follows
+    it, as listed by the CVF and ECVA."""
+    authors = container.find_next_sibling()
+    authors = authors.get_text().split(",") if authors is not None and authors.name == "dd" else []
+    return container.get_text().strip(), [author.strip() for author in authors if author.strip()]
+
+
+class Parser(abc.ABC):
     """Base Parser, which is used to parse conferences."""
-    def __init__(self, conference: str, year: int) -> None:
+    def __init__(self, conference: str, year: int, settings: Settings = None) -> None:
         self.conference = conference
         utils.check_year(year)
         self.year = year
         self.links = None
         self.base_url = utils.base_urls[self.conference]
         self.papers = []
+        self.paper_filter = filters.PaperFilter.from_settings((settings or get_settings()).filters)
+        self.validators = {}  # validators of the retrieved pages, which allow conditional requests in later runs
 
-    def get_paper_links(self, containers) -> list[str]:
-        """Retrieve links from containers."""
+    @abc.abstractmethod
+    def get_url_container(self) -> list:
+        """Get the html containers that contain the papers."""
+        pass
+
+    def get_paper_links(self, containers, known_papers: list[Paper] = None) -> list[str]:
+        """Retrieve the absolute links of the paper pages from containers. Containers of known papers are skipped."""
         print("Getting paper links.")
-        links = list(map(utils.get_link, containers))
-        if len(links) == 0:
+        if len(containers) == 0:
             raise Warning(f"No papers found at the conference {self.conference} in {self.year}")
-        else:
-            return links
+        if known_papers:
+            containers = self.drop_known_containers(containers, known_papers)
+        containers = self.filter_containers(containers)
+        links = list(map(self.get_container_link, containers))
+        return links
+
+    def get_container_link(self, container) -> str:
+        """Get the absolute link of the paper page of a container."""
+        return urljoin(f"{self.base_url}/", utils.get_link(container))
+
+    def get_container_info(self, container) -> tuple[str, list[str]]:
+        """Get the title and authors of a paper from its container, as far as they are listed."""
+        return container.get_text().strip(), []
+
+    def drop_known_containers(self, containers, known_papers: list[Paper]) -> list:
+        """Drop the containers of papers that are already part of an existing feed. The papers are identified by the
+        links of their pages. Entries of feeds that were created before the page links were stored are identified by
+        their titles."""
+        known_links = {paper.source for paper in known_papers if paper.source}
+        known_titles = {normalize_title(paper.title) for paper in known_papers if not paper.source}
+        new_containers = [container for container in containers
+                          if self.get_container_link(container) not in known_links
+                          and (not known_titles
+                               or normalize_title(self.get_container_info(container)[0]) not in known_titles)]
+        print(f"{len(containers) - len(new_containers)} of {len(containers)} papers are already known.")
+        return new_containers
+
+    def filter_containers(self, containers) -> list:
+        """Drop or defer the papers that do not pass the filter rules, before their pages are requested. Deferred papers
+        are added with the information of the containers."""
+        if not self.paper_filter.is_active:
+            return containers
+
+        kept_containers = []
+        for container in containers:
+            title, authors = self.get_container_info(container)
+            link = self.get_container_link(container)
+            if self.paper_filter.check(title, authors, link):
+                kept_containers.append(container)
+            elif self.paper_filter.defers:
+                self.papers.append(utils.Paper(title, authors, "", link, deferred=True, source=link))
+
+        print(f"{len(containers) - len(kept_containers)} of {len(containers)} papers did not pass the filters.")
+        return kept_containers
+
+    def fetch_pages(self, links: list[str], headers: list[dict] = None) -> list[utils.FetchResult]:
+        """Retrieve the html pages of the papers."""
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(utils.get_paper_html_content(links, headers))
+
+    @abc.abstractmethod
+    def parse_paper(self, soup: bs4.BeautifulSoup) -> Paper:
+        """Get the relevant information of a paper from its html page."""
+        pass
+
+    def parse_results(self, html_results: list[utils.FetchResult], links: list[str]) -> list[Paper]:
+        """Process the retrieved html pages to get the relevant information of the papers."""
+        print("Processing paper data.")
+        papers = []
+        for result, html_link in zip(html_results, links):
+            if not result.ok:
+                print(f"The paper with the link {html_link} could not be retrieved. {result.error}")
+                continue
+            if result.validators:
+                self.validators[html_link] = result.validators
+            try:
+                soup = bs4.BeautifulSoup(result.content, "lxml", from_encoding=result.encoding)
+                paper = self.parse_paper(soup)
+                paper.source = html_link
+                papers.append(paper)
+            except (IndexError, AttributeError, TypeError, StopIteration):
+                print(f"The paper with the link {html_link} could not be found.")
+        return papers
+
+    def parse_papers(self) -> None:
+        """Parse all papers by retrieving the html content and process it to get the relevant information."""
+        with profiling.stage("fetch"):
+            html_results = self.fetch_pages(self.links)
+        with profiling.stage("parse"):
+            self.papers += self.parse_results(html_results, self.links)
+
+    def recheck_papers(self, known_papers: list[Paper]) -> list[Paper]:
+        """Request the pages of known papers again and update the papers whose pages changed. Pages with stored
+        validators are requested conditionally, so unchanged pages are not downloaded again."""
+        stored_validators = utils.load_validators()
+        links = [paper.source for paper in known_papers if paper.source and not paper.deferred]
+        headers = [utils.get_conditional_header(stored_validators.get(link)) or None for link in links]
+        print(f"Checking {len(links)} known papers for changes.")
+        with profiling.stage("recheck_fetch"):
+            html_results = self.fetch_pages(links, headers)
+        modified = [idx for idx, result in enumerate(html_results) if result.status != 304]
+        with profiling.stage("recheck_parse"):
+            updated_papers = self.parse_results([html_results[idx] for idx in modified],
+                                                [links[idx] for idx in modified])
+        updated_papers = {paper.source: paper for paper in updated_papers}
+        print(f"{len(links) - len(modified)} of {len(links)} known papers were not modified.")
+        return [updated_papers.get(paper.source, paper) for paper in known_papers]
+
+    def get_papers(self, known_papers: list[Paper] = None) -> list[Paper]:
+        """Get all papers from the conference. If the papers of an existing feed are passed, solely the new papers are
+        retrieved and returned."""
+        with profiling.stage("index"):
+            container = self.get_url_container()
+            self.links = self.get_paper_links(container, known_papers)
+        self.parse_papers()
+        return self.papers
@@ -1,18 +1,15 @@
 import bs4
-import asyncio
-from misc import utils
+from misc import index_scanner
 from parsers.conferences import base
+from misc.settings import Settings
 from misc.utils import Paper
-from misc import config
-import requests
 
 
 class ECVAParser(base.Parser):
     """Parser for the ECCV which is held by the ECVA."""
-    def __init__(self, conference: str, year: int) -> None:
-        super().__init__(conference, year)
+    def __init__(self, conference: str, year: int, settings: Settings = None) -> None:
+        super().__init__(conference, year, settings)
         self.url = self.get_yearly_url()
-        self.content = requests.get(self.url, proxies=config.proxies, verify=config.verify_ssl).content.decode("utf-8")
 
     def get_yearly_url(self) -> str:
         """Get the conference url of the desired year."""
@@ -20,52 +17,23 @@ class ECVAParser(base.Parser):
             raise ValueError("The conference ECCV is only available from 2018.")
         return f"{self.base_url}/papers.php"
 
-    def get_url_container(self) -> bs4.element.ResultSet:
-        """Get the html containers that contain the papers."""
-        soup = bs4.BeautifulSoup(self.content, features="html.parser")
-        return soup.select("dt.ptitle")
-
-    def filter_links(self):
-        """Links need to be filtered according to the year, as all papers are on the same page."""
-        links = []
-        for link in self.links:
-            if f"ECCV_{self.year}" in link:
-                links.append(link)
-
-        self.links = links
-        if len(self.links) == 0:
+    def get_url_container(self) -> list[bs4.element.Tag]:
+        """Get the html containers that contain the papers. The containers need to be filtered according to the year,
+        as all papers are on the same page, which is solely requested once for all years."""
+        containers = index_scanner.get_containers(self.url, "dt", "ptitle",
+                                                  link_filter=lambda link: f"ECCV_{self.year}" in link, following="dd")
+        if len(containers) == 0:
             raise ValueError(f"No papers found at the ECCV in {self.year}")
-
-    def parse_papers(self) -> None:
-        """Parse all papers by retrieving the html content and process it to get the relevant information."""
-        loop = asyncio.get_event_loop()
-        self.links = [f"{self.base_url}/{link}" for link in self.links]
-        self.filter_links()
-        html_contents = loop.run_until_complete(utils.get_paper_html_content(self.links))
-
-        print("Processing paper data.")
-        for content, html_link in zip(html_contents, self.links):
-            try:
-                soup = bs4.BeautifulSoup(content, "html.parser")
-                # relevant infos
-                title = soup.select("#papertitle")[0].get_text()
-                title = title.strip()
-                authors = soup.select("#authors >b >i")[0].get_text().split(",")
-                abstract = soup.select("#abstract")[0].get_text()
-                abstract = abstract.strip()
-                sub_link = next(filter(lambda x: "pdf" in x.get_text(), soup.select("a"))).get("href")
-                sub_link = sub_link.replace("../", "")
-                link = f"{self.base_url}/{sub_link}"
-
-                # build and append paper
-                paper = utils.Paper(title, authors, abstract, link)
-                self.papers.append(paper)
-            except IndexError:
-                print(f"The paper with the link {self.base_url}/{html_link} could not be found.")
-
-    def get_papers(self) -> list[Paper]:
-        """Get all papers from the conference."""
-        container = self.get_url_container()
-        self.links = super().get_paper_links(container)
-        self.parse_papers()
-        return self.papers
+        return containers
+
+    def get_container_info(self, container: bs4.element.Tag) -> tuple[str, list[str]]:
+        return base.get_title_info(container)
+
+    def parse_paper(self, soup: bs4.BeautifulSoup) -> Paper:
+        title = soup.select("#papertitle")[0].get_text().strip()
+        authors = soup.select("#authors >b >i")[0].get_text().split(",")
+        abstract = soup.select("#abstract")[0].get_text().strip()
+        sub_link = next(filter(lambda x: "pdf" in x.get_text(), soup.select("a"))).get("href")
+        sub_link = sub_link.replace("../", "")
+        link = f"{self.base_url}/{sub_link}"
+        return Paper(title, authors, abstract, link)
@@ -1,18 +1,15 @@
 from misc import utils
 import bs4
-import asyncio
 from parsers.conferences import base
+from misc.settings import Settings
 from misc.utils import Paper
-from misc import config
-import requests
 
 
 class ICMLParser(base.Parser):
     """Parser for the ICML."""
-    def __init__(self, conference: str, year: int) -> None:
-        super().__init__(conference, year)
+    def __init__(self, conference: str, year: int, settings: Settings = None) -> None:
+        super().__init__(conference, year, settings)
         self.url = self.get_yearly_url()
-        self.content = requests.get(self.url, proxies=config.proxies, verify=config.verify_ssl).content.decode("utf-8")
 
     def get_yearly_url(self) -> str:
         """Get the conference url of the desired year."""
@@ -36,35 +33,20 @@ class ICMLParser(base.Parser):
 
     def get_url_container(self) -> bs4.element.ResultSet:
         """Get the html containers that contain the papers."""
-        soup = bs4.BeautifulSoup(self.content, features="html.parser")
+        soup = utils.get_soup(self.url)
         return soup.select("p.links")
 
-    def parse_papers(self) -> None:
-        """Parse all papers by retrieving the html content and process it to get the relevant information."""
-        loop = asyncio.get_event_loop()
-        html_contents = loop.run_until_complete(utils.get_paper_html_content(self.links))
-
-        print("Processing paper data.")
-        for content, html_link in zip(html_contents, self.links):
-            try:
-                soup = bs4.BeautifulSoup(content, "html.parser")
-
-                # relevant infos
-                title = soup.find("h1").getText()
-                authors = list(map(lambda x: x["content"], soup.find_all("meta", attrs={"name": "citation_author"})))
-                abstract = soup.select("#abstract")[0].get_text()
-                abstract = abstract.strip()
-                link = soup.find("meta", attrs={"name": "citation_pdf_url"})["content"]
-
-                # build and append paper
-                paper = utils.Paper(title, authors, abstract, link)
-                self.papers.append(paper)
-            except IndexError:
-                print(f"The paper with the link {self.base_url}/{html_link} could not be found.")
-
-    def get_papers(self) -> list[Paper]:
-        """Get all papers from the conference."""
-        container = self.get_url_container()
-        self.links = super().get_paper_links(container)
-        self.parse_papers()
-        return self.papers
+    def get_container_info(self, container: bs4.element.Tag) -> tuple[str, list[str]]:
+        # the containers contain solely the links, the remaining information is stored in the parent
+        paper_item = container.parent
+        title = paper_item.select_one("p.title").get_text().strip()
+        authors = paper_item.select_one("span.authors")
+        authors = authors.get_text().split(",") if authors else []
+        return title, authors
+
+    def parse_paper(self, soup: bs4.BeautifulSoup) -> Paper:
+        title = soup.find("h1").getText()
+        authors = list(map(lambda x: x["content"], soup.find_all("meta", attrs={"name": "citation_author"})))
+        abstract = soup.select("#abstract")[0].get_text().strip()
+        link = soup.find("meta", attrs={"name": "citation_pdf_url"})["content"]
+        return Paper(title, authors, abstract, link)
@@ -0,0 +1,94 @@
+from misc import config, profiling, utils
+import bs4
+import json
+from parsers.conferences import base
+from misc.settings import Settings
+from misc.utils import Paper
+from typing import Iterator
+from urllib.parse import quote, urljoin
+
+venue_ids = {"ICLR": "ICLR.cc/{year}/Conference"}  # venue id of the accepted submissions of each conference
+# first year whose accepted submissions carry the venue id, older submissions solely link to separate decision notes
+first_years = {"ICLR": 2023}
+
+
+def get_value(content: dict, key: str):
+    """Get a field of a note. The fields of the api v2 are wrapped into dicts, the fields of the api v1 are not."""
+    value = content.get(key)
+    return value.get("value") if isinstance(value, dict) else value
+
+
+class OpenReviewParser(base.Parser):
+    """Parser for the conferences hosted on OpenReview (e.g. ICLR). The accepted submissions are requested in pages
+    from the notes api, which contain all information of the papers. Thus, no paper pages are requested and the
+    submissions serve as containers."""
+    def __init__(self, conference: str, year: int, settings: Settings = None) -> None:
+        super().__init__(conference, year, settings)
+        if conference not in venue_ids:
+            raise ValueError(f"Add the venue id of {conference} to the OpenReview parser.")
+        if year < first_years[conference]:
+            raise ValueError(f"{conference} is supported from {first_years[conference]}, the submissions of older "
+                             f"years are not tagged with their venue in the OpenReview api.")
+        self.venue_id = venue_ids[conference].format(year=year)
+        # the submissions since 2024 are solely served by the api v2
+        self.api_url = config.openreview_api_url if year >= 2024 else config.openreview_api_v1_url
+        self.submissions = {}  # link of the forum page to the paper
+
+    def iter_submissions(self) -> Iterator[Paper]:
+        """Request the accepted submissions page by page and convert them into papers, so solely a single page of
+        notes is kept in memory."""
+        offset = 0
+        while True:
+            url = (f"{self.api_url}/notes?content.venueid={quote(self.venue_id)}&limit={config.openreview_page_size}"
+                   f"&offset={offset}")
+            notes = json.loads(utils.get_url_content(url).content)["notes"]
+            for note in notes:
+                yield self.parse_note(note)
+            offset += len(notes)
+            if len(notes) < config.openreview_page_size:
+                return
+
+    def parse_note(self, note: dict) -> Paper:
+        """Get the relevant information of a paper from its note."""
+        content = note["content"]
+        pdf = get_value(content, "pdf")
+        link = urljoin(f"{self.base_url}/", pdf) if pdf else f"{self.base_url}/pdf?id={note['id']}"
+        return Paper(get_value(content, "title").strip(), get_value(content, "authors") or [],
+                     (get_value(content, "abstract") or "").strip(), link,
+                     source=f"{self.base_url}/forum?id={note.get('forum', note['id'])}")
+
+    def parse_paper(self, soup: bs4.BeautifulSoup) -> Paper:
+        """Get the paper from the citation meta tags of its forum page. The papers are usually taken from the notes,
+        so the forum pages are solely parsed if they are requested directly."""
+        title = soup.find("meta", attrs={"name": "citation_title"})["content"]
+        authors = list(map(lambda x: x["content"], soup.find_all("meta", attrs={"name": "citation_author"})))
+        abstract = soup.find("meta", attrs={"name": "citation_abstract"})
+        link = soup.find("meta", attrs={"name": "citation_pdf_url"})["content"]
+        return Paper(title, authors, abstract["content"].strip() if abstract else "", link)
+
+    def get_url_container(self) -> list[Paper]:
+        """Get the papers of all accepted submissions."""
+        self.submissions = {paper.source: paper for paper in self.iter_submissions()}
+        print(f"Retrieved {len(self.submissions)} accepted submissions of {self.venue_id}.")
+        return list(self.submissions.values())
+
+    def get_container_link(self, container: Paper) -> str:
+        return container.source
+
+    def get_container_info(self, container: Paper) -> tuple[str, list[str]]:
+        return container.title, container.authors
+
+    def parse_papers(self) -> None:
+        """Take the papers of the links from the submissions, which are requested first if they are missing (e.g. in
+        the workers of shards)."""
+        if not self.submissions:
+            with profiling.stage("fetch"):
+                self.get_url_container()
+        self.papers += [self.submissions[link] for link in self.links if link in self.submissions]
+
+    def recheck_papers(self, known_papers: list[Paper]) -> list[Paper]:
+        """Update the known papers with the current information of their submissions."""
+        if not self.submissions:
+            self.get_url_container()
+        print(f"Checking {len(known_papers)} known papers for changes.")
+        return [self.submissions.get(paper.source, paper) for paper in known_papers]
@@ -1,18 +1,26 @@
-from misc import utils, generator
+from misc import config, utils, generator, ranking, dedup, profiling
+from misc.settings import Settings, get_settings
+import asyncio
 import os
+import itertools
+import warnings
 from parsers.feeds import html, parser
 from parsers.feeds.sources import process
 from tqdm import tqdm
+from concurrent.futures import Executor, ProcessPoolExecutor
 
 
 class Feed:
     """Class to handle the feed related tasks."""
-    def __init__(self, source: str, target: str, online: bool, appending: bool) -> None:
+    def __init__(self, source: str, target: str, online: bool, appending: bool, content: bytes = None,
+                 priority: int = 0, settings: Settings = None) -> None:
         self.source = source
         self.target = target
         self.online = online
         self.appending = appending
-        self.feed_parser = self.init_feedparser()
+        self.priority = priority  # papers of feeds with higher priority are requested first
+        self.settings = settings or get_settings()
+        self.feed_parser = self.init_feedparser(content)
         self.papers = []
 
     @property
@@ -35,71 +43,137 @@ class Feed:
         """Return the number of removed papers in the feed."""
         return self.n_new_papers - (self.n_papers - self.n_init_papers)
 
-    def init_feedparser(self) -> parser.FeedParser:
+    def init_feedparser(self, content: bytes = None) -> parser.FeedParser:
         """Initialize the feed parser which processes the source file."""
         if not self.online and not os.path.isfile(self.source):
             raise FileNotFoundError(f"Could not fine the file with path {self.source}")
         else:
-            return parser.FeedParser(self.source, self.target, self.online, self.appending)
+            return parser.FeedParser(self.source, self.target, self.online, self.appending, self.settings, content)
 
     def get_papers(self) -> None:
         """Retrieve all papers from the feed file."""
         self.papers = self.feed_parser.get_papers()
 
-    def content_based_update(self) -> None:
-        """Update the information of the paper based on the content retrieved from the content processors."""
-        for paper in self.papers:
-            if not paper.parsed:  # if the paper has already been parsed, there is no content update necessary
-                content_processor = None
-                domain = paper.domain
-                content = paper.html_content
+    def content_based_update(self, executor: Executor = None) -> None:
+        """Update the information of the paper based on the content retrieved from the content processors. If an
+        executor is passed, the raw contents are processed in parallel."""
+        # if the paper has already been parsed, there is no content update necessary
+        papers = [paper for paper in self.papers
+                  if (not paper.parsed or paper.retry) and paper.html_content is not None]
+        meta_data = {}
+        if executor is not None:
+            # parsed records (e.g. of arxiv) are processed directly, as they cannot be passed to other processes
+            raw_papers = [paper for paper in papers if isinstance(paper.html_content, bytes)]
+            meta_data = dict(zip(map(id, raw_papers), executor.map(
+                extract_meta_data, [paper.domain for paper in raw_papers], [paper.html_content for paper in raw_papers],
+                [paper.html_encoding for paper in raw_papers], len(raw_papers) * [self.settings.elsevier_api_key],
+                chunksize=16)))
 
-                if content is None:
-                    continue
-
-                if domain == utils.arxiv_domain:
-                    content_processor = process.ArxivContentProcessor(content)
-                elif domain == utils.ieee_domain:
-                    content_processor = process.IEEEContentProcessor(content)
-                elif domain == utils.elsevier_domain:
-                    content_processor = process.ElsevierContentProcessor(content)
-                elif domain in [utils.springer_domain, utils.nature_domain]:
-                    content_processor = process.SpringerContentProcessor(content)
-
-                if content_processor:
-                    title, abstract, authors = content_processor.get_paper_meta_data()
-                    paper.title = title
-                    paper.abstract = abstract
-                    paper.authors = authors
+        for paper in papers:
+            if id(paper) in meta_data:
+                paper_meta_data = meta_data[id(paper)]
+            else:
+                paper_meta_data = extract_meta_data(paper.domain, paper.html_content, paper.html_encoding,
+                                                    self.settings.elsevier_api_key)
+            if isinstance(paper_meta_data, ValueError):  # rejected requests are queued for the next run
+                warnings.warn(str(paper_meta_data))
+                paper.retry = True
+            elif paper_meta_data is not None:
+                paper.title, paper.abstract, paper.authors = paper_meta_data
 
     def save_feed(self) -> None:
         """Store the papers of the feed in a file."""
         generator.create_atom_feed(self.papers, result_file_name=self.target)
 
 
+def extract_meta_data(domain: str, content, encoding: str = None,
+                      elsevier_api_key: str = None) -> tuple[str, str, list[str]] | ValueError | None:
+    """Get the title, abstract and authors from the content of a paper. Returns None if the publisher is not supported
+    and the error if the request was rejected, so the function can be executed in other processes."""
+    if domain == utils.arxiv_domain:
+        content_processor = process.ArxivContentProcessor(content)
+    elif domain == utils.ieee_domain:
+        if isinstance(content, dict):  # record of a batched api request
+            content_processor = process.IEEERecordContentProcessor(content)
+        else:
+            content_processor = process.IEEEContentProcessor(content, encoding)
+    elif domain == utils.elsevier_domain:
+        if isinstance(content, dict):  # record of a batched api request
+            content_processor = process.ElsevierRecordContentProcessor(content)
+        else:
+            content_processor = process.ElsevierContentProcessor(content, encoding, elsevier_api_key)
+    elif domain in [utils.springer_domain, utils.nature_domain]:
+        content_processor = process.SpringerContentProcessor(content)
+    else:
+        return None
+
+    try:
+        return content_processor.get_paper_meta_data()
+    except ValueError as e:
+        return e
+
+
+def parse_feed_source(feed_parser: parser.FeedParser) -> parser.FeedParser:
+    """Retrieve all papers of a feed parser. Returns the parser, as it is processed in a separate process."""
+    feed_parser.get_papers()
+    return feed_parser
+
+
 class FeedList:
     """Class to store all feeds in a comprehended structure and to allow combined processing."""
-    def __init__(self, sources: list[str], targets: list[str], onlines: list[bool], appendings: list[bool]) -> None:
+    def __init__(self, sources: list[str], targets: list[str], onlines: list[bool], appendings: list[bool],
+                 priorities: list[int] = None, deadline: float = None, settings: Settings = None) -> None:
         self.sources = sources
         self.targets = targets
         self.onlines = onlines
         self.appendings = appendings
+        self.priorities = priorities or len(sources) * [0]
+        self.deadline = deadline  # time.monotonic() after which no further paper information is requested
+        self.settings = settings or get_settings()
         self.content_retriever = None
         self.feeds = self.init_feeds()
 
     def init_feeds(self) -> list[Feed]:
-        """Initialize all feeds with the input parameters."""
+        """Initialize all feeds with the input parameters. Online sources are fetched concurrently beforehand, feeds
+        whose source could not be loaded are skipped."""
         print("Initializing feeds.")
+        contents = self.load_online_sources()
         feeds = []
-        for source, target, online, appending in tqdm(zip(self.sources, self.targets, self.onlines, self.appendings),
-                                                      total=len(self.sources)):
-            feeds.append(Feed(source, target, online, appending))
+        for source, target, online, appending, priority in tqdm(zip(self.sources, self.targets, self.onlines,
+                                                                    self.appendings, self.priorities),
+                                                                total=len(self.sources)):
+            if online:
+                result = contents[source]
+                if not result.ok:
+                    warnings.warn(f"The feed {target} is skipped, as its source could not be loaded. {result.error}")
+                    continue
+                feeds.append(Feed(source, target, online, appending, result.content, priority, self.settings))
+            else:
+                feeds.append(Feed(source, target, online, appending, priority=priority, settings=self.settings))
         return feeds
 
+    def load_online_sources(self) -> dict[str, utils.FetchResult]:
+        """Fetch all online source files at once."""
+        sources = list(dict.fromkeys(source for source, online in zip(self.sources, self.onlines) if online))
+        if not sources:
+            return {}
+        loop = asyncio.get_event_loop()
+        results = loop.run_until_complete(utils.fetch_urls(sources))
+        return dict(zip(sources, results))
+
     def build_feeds(self) -> None:
-        """Build the feeds by retrieving all papers based on the source files."""
-        for feed in self.feeds:
-            feed.get_papers()
+        """Build the feeds by retrieving all papers based on the source files. The sources are parsed in parallel
+        processes and the results are merged in the order of the feeds."""
+        feed_parsers = [feed.feed_parser for feed in self.feeds]
+        if len(feed_parsers) > 1:
+            with ProcessPoolExecutor(max_workers=config.parse_workers) as executor:
+                feed_parsers = list(executor.map(parse_feed_source, feed_parsers))
+        else:
+            feed_parsers = list(map(parse_feed_source, feed_parsers))
+
+        for feed, feed_parser in zip(self.feeds, feed_parsers):
+            feed.feed_parser = feed_parser
+            feed.papers = feed_parser.papers
 
     def remove_duplicates(self) -> None:
         """Remove all duplicates papers across the different feeds in the feed list. The first occurrence is kept and
@@ -122,15 +196,54 @@ class FeedList:
                     # delete paper from feed
                     del feed.papers[duplicate_idx]
 
-    def refine_feeds(self) -> None:
+    def remove_near_duplicates(self) -> None:
+        """Remove near duplicates (e.g. the arxiv and IEEE version of the same work) across the feeds and the papers of
+        previous runs. Solely new papers are removed. If none of the duplicates exists already, the first occurrence is
+        kept and completed with the richest metadata of its duplicates."""
+        detector = dedup.NearDuplicateDetector()
+        papers = list(itertools.chain.from_iterable(map(lambda x: x.papers, self.feeds)))
+        removed_papers = set()
+        for group in detector.find_groups(papers):
+            group_papers = [papers[idx] for idx in group if idx >= 0]
+            new_papers = [paper for paper in group_papers if not paper.parsed]
+            if -1 in group or len(new_papers) < len(group_papers):
+                # the work is already part of a feed
+                removed_papers.update(map(id, new_papers))
+            else:
+                kept_paper = new_papers[0]
+                richest_paper = max(new_papers, key=dedup.get_richness)
+                kept_paper.title = richest_paper.title
+                kept_paper.abstract = richest_paper.abstract
+                kept_paper.authors = richest_paper.authors
+                removed_papers.update(map(id, new_papers[1:]))
+
+        for feed in self.feeds:
+            feed.papers = [paper for paper in feed.papers if id(paper) not in removed_papers]
+        print(f"Removed {len(removed_papers)} near duplicates.")
+        detector.update_history([paper for paper in papers if id(paper) not in removed_papers])
+
+    def refine_feeds(self, executor: Executor = None) -> None:
         """Refine the paper information in all feeds based on the stored html contents."""
-        self.get_paper_html_contents()
+        with profiling.stage("fetch"):
+            self.get_paper_html_contents()
+        with profiling.stage("extract"):
+            for feed in self.feeds:
+                feed.content_based_update(executor)
+
+    def rank_feeds(self, ranker: ranking.Ranker, top_k: int = None) -> None:
+        """Score the papers of all feeds by relevance. If top_k is set, solely the k most relevant new papers of each
+        feed are kept, while the existing papers remain unchanged."""
+        print("Ranking papers.")
         for feed in self.feeds:
-            feed.content_based_update()
+            ranker.rank(feed.papers)
+            if top_k is not None:
+                new_papers = sorted([paper for paper in feed.papers if not paper.parsed], key=lambda x: x.score,
+                                    reverse=True)
+                feed.papers = [paper for paper in feed.papers if paper.parsed] + new_papers[:top_k]
 
     def get_paper_html_contents(self) -> None:
         """Retrieve the html content for the papers (if the publisher is supported) of all feeds in the feed list."""
-        self.content_retriever = html.HTMLContentRetriever(self.feeds)
+        self.content_retriever = html.HTMLContentRetriever(self.feeds, self.settings, self.deadline)
         self.content_retriever.get_content()
 
     def print_update_stats(self) -> None:
@@ -143,3 +256,12 @@ class FeedList:
         print("Generate and save atom feeds.")
         for feed in tqdm(self.feeds, total=len(self.feeds)):
             feed.save_feed()
+        self.update_retry_queue()
+
+    def update_retry_queue(self) -> None:
+        """Queue the papers whose information could not be retrieved, so they are requested again in the next run."""
+        papers = list(itertools.chain.from_iterable(map(lambda x: x.papers, self.feeds)))
+        failed_links = [paper.link for paper in papers if paper.retry]
+        if failed_links:
+            print(f"{len(failed_links)} papers could not be updated and are queued for the next run.")
+        utils.update_retry_queue([paper.link for paper in papers], failed_links)
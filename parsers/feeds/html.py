@@ -1,5 +1,6 @@
 from __future__ import annotations
 from misc import utils
+from misc.settings import Settings
 import asyncio
 import itertools
 from parsers.feeds.sources import url
@@ -16,89 +17,191 @@ if TYPE_CHECKING:
 
 class HTMLContentRetriever:
     """Processor for html data of papers."""
-    def __init__(self, feeds: list[Feed]) -> None:
+    def __init__(self, feeds: list[Feed], settings: Settings, deadline: float = None) -> None:
         self.feeds = feeds
+        self.settings = settings
+        self.deadline = deadline  # time.monotonic() after which no further requests are started
         self.request_domain_urls = {}
         self.request_domain_headers = {}
+        self.request_domain_sizes = {}
+        self.request_domain_head_only = {}
+        self.request_domain_priorities = {}
+        self.request_domain_ids = {}  # ids of the papers of each batched request, None for other requests
+        self.request_domain_handlers = {}
         self.source_grouped_papers = defaultdict(list)
 
         # order that maps global index to the list of papers that is created for each domain in source_grouped_papers
         self.input_order_indices = defaultdict(list)
+        self.paper_ranks = {}  # global index to the position of the paper in the request order
 
         self.content_indices = []
+        self.results = []
         self.contents = []
+        self.encodings = []
+        self.failed_positions = set()  # positions of the split contents whose requests failed
 
     def get_content(self) -> None:
         """Get the html content for all papers and assign it to each one."""
         self.get_source_grouped_papers()
-        self.build_request_urls()
+        self.retrieve_contents()
+        # papers that are missing in the results of batched requests are requested individually
+        if self.get_fallback_papers():
+            self.retrieve_contents(fallback=True)
+
+    def retrieve_contents(self, fallback: bool = False) -> None:
+        """Request the contents of the grouped papers and assign them to the papers."""
+        self.build_request_urls(fallback)
         self.request_contents()
         self.split_contents()
         self.assign_contents()
 
     def get_source_grouped_papers(self) -> None:
-        """Group papers of all feeds according to their publishers to allow combined (optimized) requests later."""
+        """Group papers of all feeds according to their publishers to allow combined (optimized) requests later. The
+        papers are ordered by their priority, so the important ones are requested first (e.g. for limited time)."""
         papers = list(itertools.chain.from_iterable(list(map(lambda x: x.papers, self.feeds))))
-        for idx, paper in enumerate(papers):
-            if not paper.parsed:  # only check papers that have not been parsed before (in the preexisting feed file)
+        priorities = list(itertools.chain.from_iterable([feed.priority] * len(feed.papers) for feed in self.feeds))
+        # papers of feeds with higher priority first, then new papers before retried ones and newer before older ones
+        order = sorted(range(len(papers)), key=lambda x: papers[x].date or "", reverse=True)
+        order.sort(key=lambda x: (-priorities[x], papers[x].retry))
+        for rank, idx in enumerate(order):
+            paper = papers[idx]
+            # only check papers that have not been parsed before (in the preexisting feed file) or failed before
+            if (not paper.parsed or paper.retry) and not paper.deferred:
                 self.source_grouped_papers[paper.domain].append(paper)
                 self.input_order_indices[paper.domain].append(idx)
+                self.paper_ranks[idx] = rank
+
+    def get_fallback_papers(self) -> bool:
+        """Keep solely the grouped papers of batched requests that did not receive a record, e.g. as they are missing
+        in the search results or the request failed. Returns whether there are such papers."""
+        source_grouped_papers = defaultdict(list)
+        input_order_indices = defaultdict(list)
+        for domain, url_handler in self.request_domain_handlers.items():
+            if not (isinstance(url_handler, url.BatchedUrlHandler) and url_handler.batched):
+                continue
+            for paper, idx in zip(self.source_grouped_papers[domain], self.input_order_indices[domain]):
+                if paper.html_content is None:
+                    source_grouped_papers[domain].append(paper)
+                    input_order_indices[domain].append(idx)
+        self.source_grouped_papers = source_grouped_papers
+        self.input_order_indices = input_order_indices
+        n_papers = sum(map(len, source_grouped_papers.values()))
+        if n_papers:
+            print(f"Requesting {n_papers} papers individually, which are missing in the results of batched requests.")
+        return n_papers > 0
 
-    def build_request_urls(self) -> None:
-        """Build the request urls (and headers) based on the publisher."""
+    def build_request_urls(self, fallback: bool = False) -> None:
+        """Build the request urls (and headers) based on the publisher. For the fallback, the publishers with batched
+        requests are requested per paper (e.g. by scraping the article pages)."""
+        self.content_indices = []
+        self.failed_positions = set()
+        self.request_domain_urls = {}
+        self.request_domain_headers = {}
+        self.request_domain_sizes = {}
+        self.request_domain_head_only = {}
+        self.request_domain_priorities = {}
+        self.request_domain_ids = {}
+        self.request_domain_handlers = {}
         for domain, papers in self.source_grouped_papers.items():
             url_handler = None
             if domain == utils.arxiv_domain:
                 url_handler = url.ArxivUrlHandler.create_handler(papers)
             elif domain == utils.ieee_domain:
-                url_handler = url.IEEEUrlHandler.create_handler(papers)
+                url_handler = url.IEEEUrlHandler.create_handler(papers, settings=self.settings, fallback=fallback)
             elif domain == utils.elsevier_domain:
-                url_handler = url.ElsevierUrlHandler.create_handler(papers)
+                url_handler = url.ElsevierUrlHandler.create_handler(papers, settings=self.settings, fallback=fallback)
             elif domain in [utils.springer_domain, utils.nature_domain]:
-                url_handler = url.SpringerUrlHandler.create_handler(papers, domain=domain)
+                url_handler = url.SpringerUrlHandler.create_handler(papers, domain=domain,
+                                                                     settings=self.settings)
 
             if url_handler:
                 indices = self.input_order_indices[domain]
                 self.content_indices += indices
                 self.request_domain_urls[domain] = url_handler.get_request_urls()
                 self.request_domain_headers[domain] = url_handler.get_request_headers()
+                self.request_domain_sizes[domain] = url_handler.get_request_sizes()
+                self.request_domain_head_only[domain] = [url_handler.head_only] * len(self.request_domain_urls[domain])
+                self.request_domain_priorities[domain] = self.get_request_priorities(
+                    indices, self.request_domain_sizes[domain])
+                batched = isinstance(url_handler, url.BatchedUrlHandler) and url_handler.batched
+                self.request_domain_ids[domain] = (url_handler.get_request_ids() if batched
+                                                   else len(self.request_domain_urls[domain]) * [None])
+                self.request_domain_handlers[domain] = url_handler
+
+    def get_request_priorities(self, indices: list[int], sizes: list[int]) -> list[int]:
+        """Get the priority of each request, which is the rank of the most important paper it contains."""
+        priorities = []
+        offset = 0
+        for size in sizes:
+            ranks = [self.paper_ranks[idx] for idx in indices[offset:offset + size]]
+            priorities.append(min(ranks, default=len(self.paper_ranks)))
+            offset += size
+        return priorities
 
     def request_contents(self) -> None:
         """Request all html contents with aiohttp based on the request urls and headers."""
         loop = asyncio.get_event_loop()
         request_urls = list(itertools.chain.from_iterable(self.request_domain_urls.values()))
         request_headers = list(itertools.chain.from_iterable(self.request_domain_headers.values()))
-        self.contents = loop.run_until_complete(utils.get_paper_html_content(request_urls, request_headers))
+        request_head_only = list(itertools.chain.from_iterable(self.request_domain_head_only.values()))
+        request_priorities = list(itertools.chain.from_iterable(self.request_domain_priorities.values()))
+        self.results = loop.run_until_complete(utils.get_paper_html_content(
+            request_urls, request_headers, request_head_only, request_priorities, self.deadline))
 
     def split_contents(self) -> None:
         """Split the contents of the combined requests to ensure that each content contains only information of a
-        single papers."""
+        single papers. Contents that are parsed for splitting are passed on as parsed records."""
         split_contents = []
+        encodings = []
         domains = itertools.chain.from_iterable([[domain] * len(self.request_domain_urls[domain])
                                                  for domain in self.request_domain_urls.keys()])
-        for content, domain in zip(self.contents, domains):
-            if domain == utils.arxiv_domain:
-                content = bs4.BeautifulSoup(content, features="xml")
-                split_content = content.find_all("entry")
-                split_contents += map(str, split_content)
+        sizes = itertools.chain.from_iterable(self.request_domain_sizes.values())
+        ids = itertools.chain.from_iterable(self.request_domain_ids.values())
+        for result, domain, size, paper_ids in zip(self.results, domains, sizes, ids):
+            if not result.ok:
+                # keep the papers of failed requests aligned, so they can be queued for the next run
+                self.failed_positions.update(range(len(split_contents), len(split_contents) + size))
+                split_contents += size * [None]
+                encodings += size * [None]
+                continue
+
+            content = result.content
+            if paper_ids is not None:
+                # records of batched requests are matched by the paper ids, missing papers are requested individually
+                records = self.request_domain_handlers[domain].match_records(content, paper_ids)
+                split_contents += records
+                encodings += len(records) * [None]
+            elif domain == utils.arxiv_domain:
+                content = bs4.BeautifulSoup(content, features="xml", from_encoding=result.encoding)
+                # the entries are passed as parsed elements to avoid parsing them again in the processor
+                entries = content.find_all("entry")
+                split_contents += entries
+                encodings += len(entries) * [None]
             elif domain in [utils.springer_domain, utils.nature_domain]:
                 # TODO revisit if the multiple papers in one request are handled correctly
-                json_content = json.loads(content)["records"]
+                records = json.loads(content)["records"]
                 # check if the content is empty
-                if len(json_content) == 0:
+                if len(records) == 0:
                     split_contents += [None]
+                    encodings += [None]
                 else:
-                    split_contents += map(lambda x: json.dumps(x), json.loads(content)["records"])
+                    split_contents += records
+                    encodings += len(records) * [None]
             else:
+                # raw contents are passed on as bytes together with the declared encoding
                 split_contents.append(content)
+                encodings.append(result.encoding)
 
         self.contents = split_contents
+        self.encodings = encodings
 
     def assign_contents(self) -> None:
         """Assign the split contents to the original papers."""
         # get paper references from feeds
         papers = list(itertools.chain.from_iterable(map(lambda x: x.papers, self.feeds)))
 
-        for idx, content in zip(self.content_indices, self.contents):
+        for position, (idx, content, encoding) in enumerate(zip(self.content_indices, self.contents, self.encodings)):
             paper = papers[idx]
             paper.html_content = content
+            paper.html_encoding = encoding
+            paper.retry = position in self.failed_positions
@@ -1,10 +1,9 @@
 import bs4
-from urllib.parse import urlparse
-import requests
+from lxml import etree
 from misc.utils import Paper
-from urllib import parse
-import yaml
-from misc import config, utils
+from misc import config, utils, filters
+from misc.settings import Settings
+from parsers.feeds import scholar
 from tqdm import tqdm
 import os
 
@@ -12,18 +11,18 @@ import os
 class FeedParser:
     """Parser that retrieves the information from the provided feeds and their corresponding papers. The paper
     information refers solely to the information that is stored within the feed file."""
-    def __init__(self, file_path: str, filename: str, online: bool, appending: bool) -> None:
+    def __init__(self, file_path: str, filename: str, online: bool, appending: bool, settings: Settings,
+                 content: bytes = None) -> None:
         self.file_path = file_path
         self.appending = appending
         self.online = online
         self.existing_papers = {}
         self.feed_file_path = f"{config.result_feed_folder}/{filename}"
 
-        config_params = yaml.safe_load(open(config.config_file))
-        self.springer_key = config_params.get("springer_api_key")
-        self.elsevier_key = config_params.get("elsevier_api_key")
+        self.paper_filter = filters.PaperFilter.from_settings(settings.filters)
 
-        self.soup_content = self.load_content()
+        # online sources are usually loaded beforehand for all feeds at once
+        self.content = content if content is not None else self.load_content()
 
         self.papers = []
         self.data_loaded = False
@@ -34,17 +33,15 @@ class FeedParser:
             self.load_existing_items()
         return len(self.existing_papers)
 
-    def load_content(self) -> bs4.BeautifulSoup:
-        """Load the existing xml file of Google Scholar alert."""
+    def load_content(self) -> bytes:
+        """Load the existing xml file of Google Scholar alert. The content is kept as bytes, as lxml decodes it based on
+        the xml declaration."""
         if self.online:
-            try:
-                content = requests.get(self.file_path, proxies=config.proxies, verify=config.verify_ssl).content.decode("utf-8")
-            except requests.exceptions.InvalidSchema:
-                raise ValueError(f"{self.file_path} is no valid URL.")
+            content = utils.get_url_content(self.file_path).content
         else:
-            with open(self.file_path, "r", encoding="utf-8") as file:
+            with open(self.file_path, "rb") as file:
                 content = file.read()
-        return bs4.BeautifulSoup(content, features="xml")
+        return content
 
     def load_existing_items(self) -> None:
         """Load the existing entries of the provided atom feed file."""
@@ -54,7 +51,10 @@ class FeedParser:
                 content = file.read()
             soup = bs4.BeautifulSoup(content, features="xml")
             titles, all_authors, abstracts, links = utils.decode_xml_soup(soup)
-            self.existing_papers = {link: Paper(title, authors, abstract, link, parsed=True) for
+            # papers whose information could not be retrieved in previous runs are requested again
+            retry_links = utils.load_retry_queue()
+            self.existing_papers = {link: Paper(title, authors, abstract, link, utils.get_core_domain(link),
+                                                parsed=True, retry=link in retry_links) for
                                     title, authors, abstract, link in zip(titles, all_authors, abstracts, links)}
 
         self.data_loaded = True
@@ -66,37 +66,28 @@ class FeedParser:
             self.papers = list(self.existing_papers.values())
 
         print("Getting data from entries.")
-        entries = self.soup_content.find_all("entry")
+        root = etree.fromstring(self.content, etree.XMLParser(recover=True, huge_tree=True))
+        contents = root.findall("{*}entry/{*}content")
         already_parsed_papers = set()
-        for entry in tqdm(entries):
-            content = entry.find("content")
-            soup = bs4.BeautifulSoup(content.text, "html.parser")
-
-            paper_entries = soup.find_all("a", {"class": "gse_alrt_title"})
-            authors_str = soup.find_all("div", attrs={"style": "color:#006621;line-height:18px"})
-            all_authors = list(map(lambda x: x.text.split("-")[0].strip().split(","), authors_str))
-
-            for paper_entry, authors in zip(paper_entries, all_authors):
-                gs_url = paper_entry["href"]
-
-                # convert Google Scholar url to general url. Sometimes the paper url is not available, then skip it
-                try:
-                    url = parse.parse_qs(parse.urlparse(gs_url).query)["url"][0]
-                except KeyError:
-                    continue
-
-                domain = urlparse(url).netloc
-                core_domain = ".".join(domain.split(".")[-2:])
-
+        for content in tqdm(contents):
+            date = content.getparent().findtext("{*}updated")
+            for title, authors, url in scholar.extract_alert_papers(content.text or ""):
                 # check if already exists in old file or if already parsed
                 if url in self.existing_papers or url in already_parsed_papers:
                     continue
                 else:
-                    title = paper_entry.text
+                    already_parsed_papers.add(url)
+                    # drop or defer irrelevant papers before their information is requested
+                    deferred = False
+                    if self.paper_filter.is_active and not self.paper_filter.check(title, authors, url):
+                        if not self.paper_filter.defers:
+                            continue
+                        deferred = True
+
+                    core_domain = utils.get_core_domain(url)
                     abstract = ""
 
-                    current_paper = Paper(title, authors, abstract, url, core_domain)
+                    current_paper = Paper(title, authors, abstract, url, core_domain, deferred=deferred, date=date)
                     self.papers.append(current_paper)
-                    already_parsed_papers.add(url)
 
         return self.papers
@@ -0,0 +1,46 @@
+import html
+import re
+from typing import Iterator
+from urllib import parse
+
+# Google Scholar alert mails are generated, so a single regex pass over the mail body is sufficient. Each paper
+# consists of a title anchor, which links to the paper via a Google Scholar redirect, followed by a div with the
+# authors.
+alert_pattern = re.compile(
+    r'<a\s(?P<attrs>[^>]*\bclass="[^"]*\bgse_alrt_title\b[^"]*"[^>]*)>(?P<title>.*?)</a>'
+    r'|<div style="color:#006621;line-height:18px">(?P<authors>.*?)</div>',
+    re.S
+)
+href_pattern = re.compile(r'\bhref="(?P<href>[^"]*)"')
+tag_pattern = re.compile(r"<[^>]+>")
+
+
+def get_text(content: str) -> str:
+    """Get the text of a html snippet."""
+    return html.unescape(tag_pattern.sub("", content))
+
+
+def get_target_url(attrs: str) -> str | None:
+    """Convert the Google Scholar url of the title anchor to general url. Sometimes the paper url is not available, then
+    None is returned."""
+    match = href_pattern.search(attrs)
+    if not match:
+        return None
+    urls = parse.parse_qs(parse.urlparse(html.unescape(match.group("href"))).query).get("url")
+    return urls[0] if urls else None
+
+
+def extract_alert_papers(content: str) -> Iterator[tuple[str, list[str], str]]:
+    """Extract the title, authors and target url of all papers of a Google Scholar alert mail in a single pass. The
+    authors are assigned to the preceding title, so missing author lines do not shift the authors of other papers."""
+    current = None  # [title, authors, url] of the paper that is currently processed
+    for match in alert_pattern.finditer(content):
+        if match.group("attrs") is not None:
+            if current and current[2]:
+                yield tuple(current)
+            current = [get_text(match.group("title")), [], get_target_url(match.group("attrs"))]
+        elif current is not None and not current[1]:
+            current[1] = get_text(match.group("authors")).split("-")[0].strip().split(",")
+
+    if current and current[2]:
+        yield tuple(current)
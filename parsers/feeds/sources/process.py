@@ -4,8 +4,6 @@ import bs4
 import abc
 import json
 from typing import Any
-import yaml
-from misc import config
 
 
 class ContentProcessor(abc.ABC):
@@ -21,12 +19,11 @@ class ContentProcessor(abc.ABC):
 
 class ArxivContentProcessor(ContentProcessor):
     """Process the content related to arxiv papers."""
-    def __init__(self, content: str) -> None:
-        content = bs4.BeautifulSoup(content, features="xml")
+    def __init__(self, content: bs4.element.Tag) -> None:  # content is an already parsed entry of the api response
         super().__init__(content)
 
     def get_paper_meta_data(self) -> tuple[str, str, list[str]]:
-        title = self.content.select("entry >title")[0].text
+        title = self.content.find("title", recursive=False).text
         abstract = self.content.find("summary").text
         abstract = abstract.replace("\n", " ").strip()
         authors = self.content.select("author >name")
@@ -36,8 +33,8 @@ class ArxivContentProcessor(ContentProcessor):
 
 class IEEEContentProcessor(ContentProcessor):
     """Process the content related to IEEE papers."""
-    def __init__(self, content: str) -> None:
-        content = bs4.BeautifulSoup(content, features="lxml")
+    def __init__(self, content: bytes, encoding: str = None) -> None:
+        content = bs4.BeautifulSoup(content, features="lxml", from_encoding=encoding)
         super().__init__(content)
 
     def get_paper_meta_data(self) -> tuple[str, str, list[str]]:
@@ -53,14 +50,27 @@ class IEEEContentProcessor(ContentProcessor):
         return title, abstract, authors
 
 
+class IEEERecordContentProcessor(ContentProcessor):
+    """Process the records of the IEEE Xplore api related to IEEE papers."""
+    def __init__(self, content: dict) -> None:  # content is an already loaded article of the api response
+        super().__init__(content)
+
+    def get_paper_meta_data(self) -> tuple[str, str, list[str]]:
+        title = self.content["title"]
+        abstract = self.content.get("abstract", "")
+        authors = self.content.get("authors", {}).get("authors", [])
+        authors = list(map(lambda x: x["full_name"], authors))
+        return title, abstract, authors
+
+
 class ElsevierContentProcessor(ContentProcessor):
     """Process the content related to elsevier/sciencedirect papers."""
-    def __init__(self, content: str) -> None:
-        self.api_key = yaml.safe_load(open(config.config_file)).get("elsevier_api_key")
+    def __init__(self, content: bytes, encoding: str = None, api_key: str = None) -> None:
+        self.api_key = api_key
         if self.api_key:
             content = json.loads(content)
         else:
-            content = bs4.BeautifulSoup(content, features="lxml")
+            content = bs4.BeautifulSoup(content, features="lxml", from_encoding=encoding)
         super().__init__(content)
 
     def get_paper_meta_data(self) -> tuple[str, str, list[str]]:
@@ -94,10 +104,23 @@ class ElsevierContentProcessor(ContentProcessor):
         return title, abstract, authors
 
 
+class ElsevierRecordContentProcessor(ContentProcessor):
+    """Process the records of the Scopus search api related to elsevier/sciencedirect papers."""
+    def __init__(self, content: dict) -> None:  # content is an already loaded entry of the api response
+        super().__init__(content)
+
+    def get_paper_meta_data(self) -> tuple[str, str, list[str]]:
+        title = self.content["dc:title"]
+        abstract = self.content.get("dc:description", "")
+        authors = self.content.get("author", [])
+        authors = list(map(lambda x: f"{x['given-name']} {x['surname']}" if x.get("given-name") else x["authname"],
+                           authors))
+        return title, abstract, authors
+
+
 class SpringerContentProcessor(ContentProcessor):
     """Process the content related to springer/nature papers."""
-    def __init__(self, content: str) -> None:
-        content = json.loads(content)
+    def __init__(self, content: dict) -> None:  # content is an already loaded record of the api response
         super().__init__(content)
 
     def get_paper_meta_data(self) -> tuple[str, str, list[str]]:
@@ -1,16 +1,19 @@
 from __future__ import annotations
 import abc
 import numpy as np
+import json
 import math
 from fake_useragent import UserAgent
 import re
-from misc import config, utils
-import yaml
+from urllib.parse import quote
+from misc import utils
 
 
 class UrlHandler(abc.ABC):
     """Abstract base url handler which is used to generate the urls and headers to request additional paper
     information."""
+    head_only = False  # whether the processor of the publisher needs solely the html head of the responses
+
     def __init__(self, papers: list[utils.Paper]) -> None:
         self.papers = papers
 
@@ -28,6 +31,44 @@ class UrlHandler(abc.ABC):
         """Build headers to retrieve the publisher related paper information."""
         return len(self.papers) * [None]
 
+    def get_request_sizes(self) -> list[int]:
+        """Get the number of papers that are covered by each request."""
+        return len(self.papers) * [1]
+
+
+class BatchedUrlHandler(UrlHandler):
+    """Abstract url handler of publishers with a metadata api, which returns the records of multiple papers per request.
+    The records are matched to the papers by their ids. If batched is not set (e.g. without an api key or for the
+    fallback), the papers are requested individually."""
+    batched = False
+
+    def __init__(self, papers: list[utils.Paper], max_request_size: int) -> None:
+        super().__init__(papers)
+        self.max_request_size = max_request_size
+
+    @staticmethod
+    @abc.abstractmethod
+    def get_paper_id(paper: utils.Paper) -> str:
+        """Get the id of a paper, which is used by the metadata api."""
+        pass
+
+    def get_request_ids(self) -> list[list[str]]:
+        """Get the ids of the papers that are covered by each request."""
+        if not self.batched:
+            return [[paper.link] for paper in self.papers]
+        paper_ids = list(map(self.get_paper_id, self.papers))
+        n_splits = math.ceil(len(paper_ids) / self.max_request_size)
+        return [split.tolist() for split in np.array_split(paper_ids, n_splits)]
+
+    def get_request_sizes(self) -> list[int]:
+        return list(map(len, self.get_request_ids()))
+
+    @abc.abstractmethod
+    def match_records(self, content: bytes, ids: list[str]) -> list[dict | None]:
+        """Get the records of the papers (in the order of the ids) from the response of a batched request. Papers that
+        are missing in the response are None."""
+        pass
+
 
 class ArxivUrlHandler(UrlHandler):
     """Class to build headers/urls to retrieve arxiv paper data. Allows to group the requests into unified
@@ -37,71 +78,117 @@ class ArxivUrlHandler(UrlHandler):
         self.max_request_size = max_request_size
         self.base_url = "https://export.arxiv.org/api/query?id_list"
 
-    def get_request_urls(self) -> list[str]:
+    def get_id_splits(self) -> list[np.ndarray]:
+        """Split the arxiv ids based on the max request size."""
         arxiv_ids = list(map(lambda x: x.link.split("/")[-1], self.papers))
-
-        # split request urls based on max_request size
         n_splits = math.ceil(len(arxiv_ids) / self.max_request_size)
-        arxiv_id_splits = list(np.array_split(arxiv_ids, n_splits))
+        return list(np.array_split(arxiv_ids, n_splits))
 
+    def get_request_urls(self) -> list[str]:
         urls = []
-        for split in arxiv_id_splits:
+        for split in self.get_id_splits():
             urls.append(f"{self.base_url}={','.join(split)}&max_results={self.max_request_size}")
         return urls
 
     def get_request_headers(self) -> list[None]:
         return math.ceil(len(self.papers) / self.max_request_size) * [None]
 
+    def get_request_sizes(self) -> list[int]:
+        return list(map(len, self.get_id_splits()))
 
-class IEEEUrlHandler(UrlHandler):
-    """Class to build headers/urls to retrieve IEEE paper data."""
-    def __init__(self, papers) -> None:
-        super().__init__(papers)
+
+class IEEEUrlHandler(BatchedUrlHandler):
+    """Class to build headers/urls to retrieve IEEE paper data. With an api key, the metadata of multiple papers is
+    requested at once from the IEEE Xplore api and matched by the article numbers. Otherwise (and for papers that are
+    missing in the api results) the article pages are scraped, where all required information is stored in the meta
+    tags, so solely the html head is downloaded."""
+    head_only = True
+
+    def __init__(self, papers: list[utils.Paper], api_key: str = None, fallback: bool = False,
+                 max_request_size: int = 25) -> None:
+        super().__init__(papers, max_request_size)  # max number of search terms of a boolean query
         self.base_url = "https://ieeexplore.ieee.org/abstract/document"
+        self.api_url = "https://ieeexploreapi.ieee.org/api/v1/search/articles"
+        self.api_key = api_key
+        self.batched = bool(api_key) and not fallback
+        self.head_only = not self.batched
 
-    def get_request_urls(self) -> list[str]:
-        urls = []
-        for paper in self.papers:
-            paper_link = paper.link
-            if "abstract" in paper_link:  # not free paper
-                doc_id = paper_link.split('/')[-2]
-            else:  # free paper
-                match = re.search(r"/(?P<id>\d*)\.pdf", paper_link)
-                doc_id = match.group("id")
+    @classmethod
+    def create_handler(cls, papers: list[utils.Paper], **kwargs) -> IEEEUrlHandler:
+        return cls(papers, kwargs["settings"].ieee_api_key, kwargs.get("fallback", False))
 
-            urls.append(f"{self.base_url}/{doc_id}")
+    @staticmethod
+    def get_paper_id(paper: utils.Paper) -> str:
+        if "abstract" in paper.link:  # not free paper
+            return paper.link.split('/')[-2]
+        else:  # free paper
+            match = re.search(r"/(?P<id>\d*)\.pdf", paper.link)
+            return match.group("id")
+
+    def get_request_urls(self) -> list[str]:
+        if self.batched:
+            urls = []
+            for split in self.get_request_ids():
+                query = " OR ".join(f'"Article Number":{doc_id}' for doc_id in split)
+                urls.append(f"{self.api_url}?querytext={quote(f'({query})')}&max_records={self.max_request_size}"
+                            f"&format=json&apikey={self.api_key}")
+        else:
+            urls = [f"{self.base_url}/{self.get_paper_id(paper)}" for paper in self.papers]
 
         return urls
 
     def get_request_headers(self) -> list[dict]:
+        if self.batched:
+            return len(self.get_request_ids()) * [{"Accept": "application/json"}]
         user_agent = UserAgent()
         headers = {"User-Agent": user_agent.firefox}
         return len(self.papers) * [headers]
 
-
-class ElsevierUrlHandler(UrlHandler):
-    """Class to build headers/urls to retrieve elsevier/sciencedirect paper data."""
-    def __init__(self, papers: list[utils.Paper], api_key: str = None) -> None:
-        super().__init__(papers)
+    def match_records(self, content: bytes, ids: list[str]) -> list[dict | None]:
+        try:
+            articles = json.loads(content).get("articles") or []
+        except (ValueError, AttributeError):  # e.g. error pages of rejected keys
+            articles = []
+        records = {str(article.get("article_number")): article for article in articles}
+        return [records.get(doc_id) for doc_id in ids]
+
+
+class ElsevierUrlHandler(BatchedUrlHandler):
+    """Class to build headers/urls to retrieve elsevier/sciencedirect paper data. With an api key, the metadata of
+    multiple papers is requested at once from the Scopus search api and matched by the PIIs. Papers that are missing
+    in the search results are requested individually from the article api. Without an api key the article pages are
+    scraped."""
+    def __init__(self, papers: list[utils.Paper], api_key: str = None, fallback: bool = False,
+                 max_request_size: int = 25) -> None:
+        super().__init__(papers, max_request_size)  # api max support of the complete view is 25
         self.base_url = "https://api.elsevier.com/content/article/pii"
+        self.search_url = "https://api.elsevier.com/content/search/scopus"
         self.api_key = api_key
+        self.batched = bool(api_key) and not fallback
 
     @classmethod
     def create_handler(cls, papers: list[utils.Paper], **kwargs) -> ElsevierUrlHandler | None:
-        api_key = yaml.safe_load(open(config.config_file)).get("elsevier_api_key")
-        if api_key:
-            return cls(papers, api_key)
-        else:
-            return cls(papers)
+        return cls(papers, kwargs["settings"].elsevier_api_key, kwargs.get("fallback", False))
+
+    @staticmethod
+    def get_paper_id(paper: utils.Paper) -> str:
+        match = re.search("pii/(?P<pii>.*)", paper.link)
+        return match.group("pii")
+
+    @staticmethod
+    def normalize_pii(pii: str) -> str:
+        """PIIs are also written with separators, e.g. S0031-3203(21)00012-3."""
+        return re.sub(r"[^0-9A-Z]", "", pii.upper())
 
     def get_request_urls(self) -> list[str]:
-        if self.api_key:
+        if self.batched:
             urls = []
-            for paper in self.papers:
-                paper_link = paper.link
-                match = re.search("pii/(?P<pii>.*)", paper_link)
-                pii = match.group("pii")
-                urls.append(f"{self.base_url}/{pii}?apiKey={self.api_key}")
+            for split in self.get_request_ids():
+                query = " OR ".join(f"PII({pii})" for pii in split)
+                urls.append(f"{self.search_url}?query={quote(query)}&view=COMPLETE&count={self.max_request_size}"
+                            f"&apiKey={self.api_key}")
+        elif self.api_key:
+            urls = [f"{self.base_url}/{self.get_paper_id(paper)}?apiKey={self.api_key}" for paper in self.papers]
         else:
             urls = [paper.link for paper in self.papers]
 
@@ -113,7 +200,16 @@ class ElsevierUrlHandler(UrlHandler):
         else:
             user_agent = UserAgent()
             headers = {"User-Agent": user_agent.firefox}
-        return len(self.papers) * [headers]
+        return len(self.get_request_sizes()) * [headers]
+
+    def match_records(self, content: bytes, ids: list[str]) -> list[dict | None]:
+        try:
+            entries = json.loads(content)["search-results"].get("entry") or []
+        except (ValueError, KeyError, AttributeError):  # e.g. service errors of keys without access to the view
+            entries = []
+        # empty results consist of a single entry with an error message
+        records = {self.normalize_pii(entry["pii"]): entry for entry in entries if "pii" in entry}
+        return [records.get(self.normalize_pii(pii)) for pii in ids]
 
 
 class SpringerUrlHandler(UrlHandler):
@@ -130,7 +226,7 @@ class SpringerUrlHandler(UrlHandler):
     @classmethod
     def create_handler(cls, papers: list[utils.Paper], **kwargs) -> SpringerUrlHandler | None:
         domain = kwargs["domain"]
-        api_key = yaml.safe_load(open(config.config_file)).get("springer_api_key")
+        api_key = kwargs["settings"].springer_api_key
         if api_key:
             return cls(papers, api_key, domain)
         else:
@@ -165,3 +261,7 @@ class SpringerUrlHandler(UrlHandler):
 
     def get_request_headers(self) -> list[None]:
         return math.ceil(len(self.papers) / self.max_request_size) * [None]
+
+    def get_request_sizes(self) -> list[int]:
+        n_splits = math.ceil(len(self.papers) / self.max_request_size)
+        return list(map(len, np.array_split(np.arange(len(self.papers)), n_splits)))
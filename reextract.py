@@ -0,0 +1,88 @@
+import argparse
+import itertools
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from misc import config, generator, utils
+from misc.settings import Settings, get_settings
+from parse_conference import get_parser
+from parsers.conferences import base
+from parsers.feeds import feed
+
+worker_parser = None  # parser of the worker processes
+
+
+def init_worker(paper_parser: base.Parser) -> None:
+    """Serve the requests of a worker process from the page archive."""
+    global worker_parser
+    utils.offline = True
+    worker_parser = paper_parser
+
+
+def parse_links(links: list[str]) -> list[utils.Paper]:
+    """Parse the archived pages of the links in a worker process."""
+    worker_parser.links = links
+    worker_parser.papers = []
+    worker_parser.parse_papers()
+    return worker_parser.papers
+
+
+def reextract_conference(conference: str, year: int, settings: Settings, workers: int) -> None:
+    """Rebuild the feed of a conference from the archived index and paper pages. The pages are parsed in parallel."""
+    paper_parser = get_parser(conference, year, settings)
+    links = paper_parser.get_paper_links(paper_parser.get_url_container())
+    chunks = [chunk.tolist() for chunk in np.array_split(links, max(min(workers, len(links)), 1))]
+    print(f"Extracting {len(links)} papers with {len(chunks)} workers.")
+    with ProcessPoolExecutor(max_workers=len(chunks), initializer=init_worker, initargs=(paper_parser,)) as executor:
+        papers = paper_parser.papers + list(itertools.chain.from_iterable(executor.map(parse_links, chunks)))
+    print("Generate and save atom feeds.")
+    generator.create_atom_feed(papers, conference=conference, year=year)
+
+
+def reextract_feeds(targets: list[str], settings: Settings, workers: int) -> None:
+    """Extract the information of the papers of existing feeds again from the archived pages of the publishers. Papers
+    whose pages are not archived keep their current information."""
+    sources = [f"{config.result_feed_folder}/{target}" for target in targets]
+    feed_list = feed.FeedList(sources, targets, len(targets) * [False], len(targets) * [False], settings=settings)
+    for current_feed in feed_list.feeds:
+        current_feed.papers = utils.load_atom_feed(current_feed.source)
+        for paper in current_feed.papers:
+            paper.domain = utils.get_core_domain(paper.link)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        feed_list.refine_feeds(executor)
+    print("Generate and save atom feeds.")
+    for current_feed in feed_list.feeds:
+        n_missing = len([paper for paper in current_feed.papers if paper.retry])
+        if n_missing:
+            print(f"{current_feed.target}: {n_missing} papers are not archived and keep their information.")
+        current_feed.save_feed()
+
+
+def main(args: argparse.Namespace) -> None:
+    """Main method to extract the papers again from the page archive, without network access."""
+    utils.offline = True
+    settings = get_settings()
+    workers = args.workers or config.parse_workers or os.cpu_count()
+    if args.conference:
+        reextract_conference(args.conference, args.year, settings, workers)
+    elif args.use_config:
+        reextract_feeds([pairing.target for pairing in settings.pairings], settings, workers)
+    elif args.target:
+        reextract_feeds(args.target, settings, workers)
+    else:
+        raise ValueError("Pass a conference and year, feed targets or use the pairings of the config file.")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--conference", "-c",
+                            help="Supported conferences are: 'CVPR', 'WACV', 'ICCV', 'ECCV', 'ICML', 'NIPS' and "
+                                 "'ICLR'.")
+    arg_parser.add_argument("--year", "-y", type=int, help="Year of the conference.")
+    arg_parser.add_argument("--target", "-t", nargs="+", help="Name/s of the result feed file/s (e.g. feed.xml).")
+    arg_parser.add_argument("--use_config", "-u", type=bool, default=False,
+                            help="Extract the target feeds of the pairings of the config file again.")
+    arg_parser.add_argument("--workers", "-w", type=int,
+                            help="Number of processes to parse the pages, by default the parse workers of the config.")
+    input_args = arg_parser.parse_args()
+    main(input_args)
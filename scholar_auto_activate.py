@@ -1,51 +1,123 @@
 import argparse
-from misc import config
-from tqdm import tqdm
+import asyncio
+import json
+import os
+import time
+import warnings
+from misc import config, profiling, utils
 import re
-import requests
+from urllib import parse
 from fake_useragent import UserAgent
 
+link_pattern = re.compile(
+    r"(?P<link>http://scholar.google.com/scholar_alerts\?update_op=confirm_alert.*?alert_id.*?)&#x22;"
+)
 
-def load_file(file_path: str) -> str:
-    """Load feed file and get it's content."""
-    try:
-        content = requests.get(file_path, proxies=config.proxies, verify=config.verify_ssl).content.decode("utf-8")
-    except requests.exceptions.InvalidSchema:
-        raise ValueError(f"{file_path} is no valid URL.")
-    return content
+
+def load_state() -> dict:
+    """Load the activation state of the inboxes, i.e. their confirmed alert ids and failed attempts."""
+    if not os.path.isfile(config.activation_state_file):
+        return {}
+    with open(config.activation_state_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_state(state: dict) -> None:
+    """Save the activation state of the inboxes."""
+    with open(config.activation_state_file, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=1)
+
+
+def get_links(content: str) -> list[str]:
+    """Extract all confirmation links from feed content."""
+    links = []
+    for match in link_pattern.finditer(content):
+        link = match.group("link")
+        link = link.replace("amp;", "&").replace(";", "").replace("#", "")
+        links.append(link)
+    return links
 
 
-def get_link(content: str) -> str:
-    """Extract confirmation link from feed content."""
-    match = re.search(
-        r"(?P<link>http://scholar.google.com/scholar_alerts\?update_op=confirm_alert.*?alert_id.*?)&#x22;",
-        content
-    )
-    link = match.group("link")
-    link = link.replace("amp;", "&").replace(";", "").replace("#", "")
-    return link
+def get_alert_id(link: str) -> str:
+    """Get the alert id of a confirmation link."""
+    return parse.parse_qs(parse.urlparse(link).query).get("alert_id", [link])[0]
+
+
+def record_failure(inbox_state: dict, message: str) -> None:
+    """Record a failed activation of an inbox, which is then only retried after an exponential backoff."""
+    inbox_state["failures"] = inbox_state.get("failures", 0) + 1
+    inbox_state["retry_after"] = time.time() + config.activation_backoff * 2 ** (inbox_state["failures"] - 1)
+    warnings.warn(message)
 
 
 def activate(args: argparse.Namespace) -> None:
     """Activate the Google Scholar feeds automatically by extracting the confirmation link and opening it via requests
     and a header to emulate a user. Basic request calls are blocked by Google. Google Scholar does NOT send out a mail
     if the confirmation was completed successful. Instead, you should get recommendations in your feed as soon as Google
-    Scholar sends out a mail notification (usually every few days based on your keywords)."""
+    Scholar sends out a mail notification (usually every few days based on your keywords).
+    All inboxes are loaded concurrently, while the confirmations are sent in small groups to avoid bursts of requests to
+    Google. Confirmed alert ids are stored, so solely new alerts of the inboxes are confirmed in the following runs.
+    Failed inboxes are retried in later runs with an increasing backoff."""
     print("Activating google scholar feeds.")
-    files = args.files
+    state = load_state()
+    now = time.time()
+    files = []
+    for file in dict.fromkeys(args.files):
+        inbox_state = state.setdefault(file, {})
+        if inbox_state.get("retry_after", 0) > now and not args.force:
+            print(f"Skipping {file} until the backoff of previous failures has passed.")
+            continue
+        files.append(file)
+
+    loop = asyncio.get_event_loop()
+    with profiling.stage("inboxes"):
+        inbox_results = loop.run_until_complete(utils.fetch_urls(files))
 
-    user_agent = UserAgent()
-    headers = {'User-Agent': user_agent.chrome}
-    for file in tqdm(files):
-        content = load_file(file)
-        link = get_link(content)
-        response = requests.get(link, proxies=config.proxies, headers=headers, verify=config.verify_ssl)
-        if response.status_code != 200:
-            raise Warning(f"Google seems to block the automatic activation. You can either try to wait or open the link {link} manually.")
+    confirmations = []
+    with profiling.stage("links"):
+        for file, result in zip(files, inbox_results):
+            inbox_state = state[file]
+            if not result.ok:
+                record_failure(inbox_state, f"Could not load {file}. {result.error}")
+                continue
+            confirmed_ids = set(inbox_state.get("alert_ids", []))
+            links = [link for link in get_links(result.text) if get_alert_id(link) not in confirmed_ids]
+            if not links and not confirmed_ids:
+                record_failure(inbox_state, f"No confirmation link found in {file}.")
+            confirmations += [(file, link) for link in dict.fromkeys(links)]
+
+    headers = {'User-Agent': UserAgent().chrome}
+    links = [link for _, link in confirmations]
+    confirmation_results = []
+    with profiling.stage("confirmations"):
+        for start in range(0, len(links), config.activation_concurrency):
+            if start:
+                time.sleep(config.activation_interval)
+            group = links[start:start + config.activation_concurrency]
+            confirmation_results += loop.run_until_complete(utils.fetch_urls(group, len(group) * [headers]))
+    for (file, link), result in zip(confirmations, confirmation_results):
+        inbox_state = state[file]
+        if result.ok and result.status == 200:
+            inbox_state["alert_ids"] = inbox_state.get("alert_ids", []) + [get_alert_id(link)]
+            inbox_state.pop("failures", None)
+            inbox_state.pop("retry_after", None)
+        else:
+            record_failure(inbox_state, f"Google seems to block the automatic activation. You can either try to wait "
+                                        f"or open the link {link} manually.")
+
+    save_state(state)
 
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser()
     arg_parser.add_argument("--files", "-f", nargs='+', help="Path/s to the xml file/s.")
+    arg_parser.add_argument("--force", type=bool, default=False,
+                            help="Check also the inboxes with recent failures.")
+    arg_parser.add_argument("--profiling", choices=profiling.modes,
+                            help="Profile the cpu time or memory of each stage, the results are stored in profiles/.")
     input_args = arg_parser.parse_args()
-    activate(input_args)
+    profiling.start(input_args.profiling, "scholar_auto_activate")
+    try:
+        activate(input_args)
+    finally:
+        profiling.stop()
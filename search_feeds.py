@@ -0,0 +1,46 @@
+import argparse
+import glob
+import os
+import time
+from misc import config, generator, search_index, utils
+
+
+def reindex() -> None:
+    """Add the papers of all existing feeds to the search index, e.g. of feeds that were created before the index."""
+    index = search_index.SearchIndex()
+    for file_path in sorted(glob.glob(f"{config.result_feed_folder}/*.xml")):
+        papers = utils.load_atom_feed(file_path)
+        print(f"Indexing {len(papers)} papers of {os.path.basename(file_path)}.")
+        index.update(os.path.basename(file_path), papers)
+
+
+def main(args: argparse.Namespace) -> None:
+    """Main method to query the papers of all generated feeds."""
+    if args.reindex:
+        reindex()
+    start = time.perf_counter()
+    results = search_index.SearchIndex().search(args.query or "", args.author, args.feed, args.since, args.until,
+                                                args.limit)
+    print(f"Found {len(results)} papers in {1000 * (time.perf_counter() - start):.1f} ms.")
+    if args.output:
+        generator.create_atom_feed([paper for _, paper in results], result_file_name=args.output, index=False)
+    else:
+        for feed, paper in results:
+            print(f"{feed}: {paper.title} ({', '.join(paper.authors)}) {paper.link}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--query", "-q", help="Words that the title or abstract of the papers have to contain.")
+    arg_parser.add_argument("--author", "-a", nargs="+", help="Authors that the papers have to include.")
+    arg_parser.add_argument("--feed", "-f", nargs="+",
+                            help="Prefixes of the feeds to search, e.g. CVPR ICCV ECCV. By default all feeds are used.")
+    arg_parser.add_argument("--since", type=int, help="First year of the conference feeds to search.")
+    arg_parser.add_argument("--until", type=int, help="Last year of the conference feeds to search.")
+    arg_parser.add_argument("--limit", "-l", type=int, help="Maximal number of returned papers.")
+    arg_parser.add_argument("--output", "-o",
+                            help="Name of an atom feed file in the result feed folder, which stores the found papers.")
+    arg_parser.add_argument("--reindex", type=bool, default=False,
+                            help="Add the papers of all existing feeds to the index before searching.")
+    input_args = arg_parser.parse_args()
+    main(input_args)
@@ -0,0 +1,62 @@
+import argparse
+import glob
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+fixture_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "openreview")
+
+
+def load_fixtures() -> dict:
+    """Load the recorded notes of the fixtures, grouped by their venue id."""
+    venues = {}
+    for file_path in sorted(glob.glob(f"{fixture_folder}/*.json")):
+        with open(file_path, "r", encoding="utf-8") as file:
+            for note in json.load(file)["notes"]:
+                venue_id = note["content"]["venueid"]
+                venue_id = venue_id["value"] if isinstance(venue_id, dict) else venue_id
+                venues.setdefault(venue_id, []).append(note)
+    return venues
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serve the paginated notes endpoint of the OpenReview api (v1 and v2) from the fixtures."""
+    venues = load_fixtures()
+    requests = []  # paths of the served requests
+
+    def do_GET(self) -> None:
+        parts = urlparse(self.path)
+        query = parse_qs(parts.query)
+        self.requests.append(self.path)
+        if parts.path != "/notes" or "content.venueid" not in query:
+            self.send_error(400, "Solely /notes?content.venueid=... is supported.")
+            return
+        notes = self.venues.get(query["content.venueid"][0], [])
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", ["1000"])[0])
+        body = json.dumps({"notes": notes[offset:offset + limit], "count": len(notes)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_stand_in(port: int = 0) -> ThreadingHTTPServer:
+    """Start the stand-in endpoint in a background thread, the url is http://127.0.0.1:{server.server_port}."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--port", type=int, default=8777, help="Port of the stand-in endpoint.")
+    input_args = arg_parser.parse_args()
+    print(f"Serving the OpenReview fixtures on http://127.0.0.1:{input_args.port}, set it as openreview_api_url.")
+    ThreadingHTTPServer(("127.0.0.1", input_args.port), StandInHandler).serve_forever()
@@ -0,0 +1,51 @@
+import pytest
+from misc import config
+from misc.settings import Settings
+from openreview_stand_in import StandInHandler, start_stand_in
+from parsers.conferences import openreview
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = start_stand_in()
+    url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(config, "openreview_api_url", url)
+    monkeypatch.setattr(config, "openreview_api_v1_url", url)
+    monkeypatch.setattr(config, "openreview_page_size", 2)
+    monkeypatch.setattr(config, "archive_pages", False)
+    StandInHandler.requests.clear()
+    yield StandInHandler.requests
+    server.shutdown()
+
+
+def test_api_v2(stand_in):
+    papers = openreview.OpenReviewParser("ICLR", 2024, Settings()).get_papers()
+    assert len(stand_in) == 2  # pages of 2 notes
+    assert [paper.title for paper in papers] == ["Sparse Attention Fields for Long-Horizon Video Generation",
+                                                 "On the Calibration of  Diffusion Classifiers",
+                                                 "Provable Guarantees for Federated Low-Rank Adaptation"]
+    assert papers[0].authors == ["Ada Lind", "Ben Okafor"]
+    assert papers[0].abstract.startswith("We study sparse attention") and not papers[0].abstract.endswith("\n")
+    assert papers[0].link == "https://openreview.net/pdf/3f9a1c2e7b4d5a6f8e0c1b2a3d4e5f6a7b8c9d0e.pdf"
+    assert papers[2].link == "https://openreview.net/pdf?id=hY6cD0sJ8e"
+    assert papers[1].source == "https://openreview.net/forum?id=T7vB3nWq1Z"
+
+
+def test_api_v1(stand_in):
+    papers = openreview.OpenReviewParser("ICLR", 2023, Settings()).get_papers()
+    assert [paper.title for paper in papers] == ["Graph Rewiring with Spectral Priors", "Learning to Compress Policies"]
+    assert papers[1].authors == ["Ines Moreau"]
+    assert papers[1].abstract == "Abstract of Learning to Compress Policies."
+    assert len(stand_in) == 2  # the second page is empty
+
+
+def test_known_papers_are_skipped(stand_in):
+    paper_parser = openreview.OpenReviewParser("ICLR", 2024, Settings())
+    known = paper_parser.get_papers()[:2]
+    papers = openreview.OpenReviewParser("ICLR", 2024, Settings()).get_papers(known)
+    assert [paper.source for paper in papers] == ["https://openreview.net/forum?id=hY6cD0sJ8e"]
+
+
+def test_unsupported_year():
+    with pytest.raises(ValueError):
+        openreview.OpenReviewParser("ICLR", 2022, Settings())